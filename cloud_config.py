@@ -7,6 +7,9 @@
 邮箱：953534947@qq.com
 """
 
+import os
+from functools import lru_cache
+
 # 云端数据获取配置
 CLOUD_CONFIG = {
     # 超时设置（秒）
@@ -62,10 +65,10 @@ CLOUD_CONFIG = {
     }
 }
 
-# 云端环境检测
+# 云端环境检测（进程内环境变量不变，只需检测一次）
+@lru_cache(maxsize=1)
 def is_cloud_environment():
     """检测是否在云端环境运行"""
-    import os
     # Streamlit Cloud环境变量
     return (
         os.getenv('STREAMLIT_SHARING_MODE') is not None or
@@ -74,17 +77,18 @@ def is_cloud_environment():
         'share.streamlit.io' in os.getenv('SERVER_NAME', '')
     )
 
+# 本地环境使用更宽松的配置
+# 嵌套字典逐层新建，避免修改共享的CLOUD_CONFIG
+_LOCAL_CONFIG = {
+    **CLOUD_CONFIG,
+    "timeouts": {**CLOUD_CONFIG["timeouts"], "广期所": 60},          # 本地给广期所更多时间
+    "concurrency": {**CLOUD_CONFIG["concurrency"], "max_workers": 3},  # 本地可以更多并发
+}
+
 # 获取适合云端的配置
 def get_cloud_optimized_config():
     """获取云端优化配置"""
-    if is_cloud_environment():
-        return CLOUD_CONFIG
-    else:
-        # 本地环境使用更宽松的配置
-        local_config = CLOUD_CONFIG.copy()
-        local_config["timeouts"]["广期所"] = 60  # 本地给广期所更多时间
-        local_config["concurrency"]["max_workers"] = 3  # 本地可以更多并发
-        return local_config
+    return CLOUD_CONFIG if is_cloud_environment() else _LOCAL_CONFIG
 
 # 应用云端优化
 def apply_cloud_optimizations():
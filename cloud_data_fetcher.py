@@ -11,23 +11,181 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import os
 import json
+import random
+import socket
+import threading
+import zlib
+from functools import update_wrapper
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from cloud_config import CLOUD_CONFIG, get_cloud_optimized_config
+from utils import save_sheets_parquet
 import warnings
 warnings.filterwarnings('ignore')
 
+# 持仓数据接口配置 - 按成功率排序
+POSITION_EXCHANGES = [
+    {"name": "大商所", "func_name": "futures_dce_position_rank"},
+    {"name": "中金所", "func_name": "get_cffex_rank_table"},
+    {"name": "郑商所", "func_name": "get_czce_rank_table"},
+    {"name": "上期所", "func_name": "get_shfe_rank_table"},
+    {"name": "广期所", "func_name": "futures_gfex_position_rank"},
+]
+
+# 行情数据交易所配置
+PRICE_EXCHANGES = [
+    {"market": "DCE", "name": "大商所"},
+    {"market": "CFFEX", "name": "中金所"},
+    {"market": "CZCE", "name": "郑商所"},
+    {"market": "SHFE", "name": "上期所"},
+]
+PRICE_EXCHANGE_NAMES = [e["name"] for e in PRICE_EXCHANGES]
+
+class StaleWhileRevalidateCache:
+    """
+    过期后先返回旧数据、再在后台刷新的缓存
+    首次获取在前台执行；数据过期后立即返回旧值，同时启动后台线程刷新，
+    同一个键同时只会有一个刷新任务。获取失败时抛出异常且不写入缓存。
+    """
+    
+    def __init__(self, func, ttl: float, max_entries: int = 50):
+        self.func = func
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}        # key -> (value, fetched_at)
+        self._refreshing = set()  # 正在后台刷新的键
+        self._lock = threading.Lock()
+        update_wrapper(self, func)
+    
+    def __call__(self, *key):
+        with self._lock:
+            entry = self._entries.get(key)
+        
+        if entry is None:
+            return self._refresh(key)
+        
+        value, fetched_at = entry
+        if time.time() - fetched_at > self.ttl:
+            self._start_background_refresh(key)
+        return value
+    
+    def _refresh(self, key):
+        """前台获取数据并写入缓存"""
+        value = self.func(*key)
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            # 超出容量时淘汰最早获取的数据
+            while len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][1])
+                del self._entries[oldest]
+        return value
+    
+    def _start_background_refresh(self, key):
+        """启动后台刷新（已有刷新任务时跳过）"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        try:
+            threading.Thread(target=self._background_refresh, args=(key,), daemon=True).start()
+        except RuntimeError:
+            # 无法创建线程时退回前台刷新，失败则继续使用旧数据
+            self._background_refresh(key)
+    
+    def _background_refresh(self, key):
+        """后台刷新，失败时保留旧数据"""
+        try:
+            self._refresh(key)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+def stale_while_revalidate(ttl: float):
+    """过期后台刷新的缓存装饰器"""
+    def decorator(func):
+        return StaleWhileRevalidateCache(func, ttl)
+    return decorator
+
+@stale_while_revalidate(ttl=CLOUD_CONFIG["cache"]["data_ttl"])
+def _fetch_one_exchange(name: str, trade_date: str) -> Dict[str, pd.DataFrame]:
+    """
+    获取单个交易所持仓数据，按(交易所, 交易日期)缓存
+    获取失败时抛出异常，避免把失败结果写入缓存
+    """
+    import akshare as ak
+    
+    exchange = next(e for e in POSITION_EXCHANGES if e["name"] == name)
+    data_dict = get_cloud_fetcher().safe_akshare_call(getattr(ak, exchange["func_name"]), name, date=trade_date)
+    if not data_dict:
+        raise ValueError(f"{name} 未返回数据")
+    return data_dict
+
+@stale_while_revalidate(ttl=CLOUD_CONFIG["cache"]["data_ttl"])
+def _fetch_price_one(market: str, trade_date: str) -> pd.DataFrame:
+    """
+    获取单个交易所行情数据，按(市场, 交易日期)缓存
+    获取失败时抛出异常，避免把失败结果写入缓存
+    """
+    import akshare as ak
+    
+    df = get_cloud_fetcher().safe_akshare_call(
+        ak.get_futures_daily,
+        "行情数据",
+        start_date=trade_date,
+        end_date=trade_date,
+        market=market
+    )
+    if df is None or df.empty:
+        raise ValueError(f"{market} 行情数据为空")
+    return df
+
+# 交易日历获取失败后的跳过时间（秒）：期间不再请求日历，直接跳过交易日检查
+CALENDAR_RETRY_SECONDS = 600
+_calendar_failed_until = 0.0
+
+@st.cache_resource(ttl=86400, show_spinner=False)
+def _get_trade_calendar() -> Tuple[frozenset, str]:
+    """
+    获取交易日历（新浪交易日历，每天刷新一次）
+    :return: (交易日集合 YYYYMMDD, 日历覆盖的最后日期)
+    """
+    import akshare as ak
+    
+    trade_dates = pd.to_datetime(ak.tool_trade_date_hist_sina()['trade_date']).dt.strftime('%Y%m%d')
+    return frozenset(trade_dates), trade_dates.max()
+
 class CloudDataFetcher:
     """云端数据获取器 - 专门处理云端环境的数据获取问题"""
     
     def __init__(self):
-        self.session = self.create_session()
-        self.max_retries = 3
+        self._session = None  # 首次使用时再创建，避免导入/构造时分配未用到的连接池
+        self._session_lock = threading.Lock()
+        self.config = get_cloud_optimized_config()
+        self.max_retries = 3  # 配置中未列出的数据源使用的默认值
         self.timeout = 30
-        self.delay_between_requests = 2  # 请求间隔
+        self.backoff_base = 0.5  # 重试退避基数（秒）
+        self.backoff_cap = 15    # 重试退避上限（秒）
+        self.timeout_backoff = 5  # 超时失败额外等待（秒）
+        self.rate_limit_backoff = 10  # 限流且未返回Retry-After时的等待（秒）
+        self.max_workers = self.config["concurrency"]["max_workers"]  # 并发获取线程数
         
+    @property
+    def session(self) -> requests.Session:
+        """按需创建的请求会话（网络诊断等会在多个线程中同时首次访问，加锁保证只创建一个）"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.create_session()
+        return self._session
+    
     def create_session(self):
         """创建优化的请求会话"""
         session = requests.Session()
@@ -38,35 +196,97 @@ class CloudDataFetcher:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         })
+        
+        # 连接池足够容纳并发请求，重试由safe_akshare_call负责
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
         return session
     
-    def safe_akshare_call(self, func, *args, **kwargs):
-        """安全的akshare调用，包含重试机制"""
-        for attempt in range(self.max_retries):
+    def safe_akshare_call(self, func, exchange_name: str, *args, **kwargs):
+        """
+        安全的akshare调用，包含超时和重试机制
+        超时时间和重试次数按数据源名称从配置中读取（如广期所更长超时、更多重试）
+        该方法会在线程池中执行，因此不直接输出Streamlit消息；
+        所有尝试都抛出异常时重新抛出最后一次异常，由调用方统一展示
+        """
+        timeout = self.config["timeouts"].get(exchange_name, self.timeout)
+        max_retries = self.config["retries"].get(exchange_name, self.max_retries)
+        last_error = None
+        
+        for attempt in range(max_retries):
+            error = None
             try:
-                # 添加延迟避免请求过快
-                if attempt > 0:
-                    time.sleep(self.delay_between_requests * attempt)
-                
-                result = func(*args, **kwargs)
+                result = self._call_with_timeout(func, timeout, *args, **kwargs)
                 if result is not None:
                     return result
                     
             except Exception as e:
-                error_msg = str(e)
-                if attempt == self.max_retries - 1:
-                    st.warning(f"数据获取失败 (尝试 {attempt + 1}/{self.max_retries}): {error_msg}")
-                else:
-                    st.info(f"重试中... (尝试 {attempt + 1}/{self.max_retries})")
-                
-                # 特定错误的处理
-                if "timeout" in error_msg.lower():
-                    time.sleep(5)  # 超时错误等待更长时间
-                elif "rate limit" in error_msg.lower():
-                    time.sleep(10)  # 频率限制等待更长时间
-                    
+                error = last_error = e
+            
+            # 失败后再等待，首次调用没有额外延迟
+            if attempt < max_retries - 1:
+                time.sleep(self._retry_delay(attempt, error))
+        
+        if last_error is not None:
+            raise last_error
         return None
     
+    def _call_with_timeout(self, func, timeout: float, *args, **kwargs):
+        """
+        在独立线程中执行调用并限制等待时间
+        akshare接口不支持timeout参数，signal.alarm也只能在主线程使用，
+        超时后放弃等待（后台调用自行结束），抛出concurrent.futures.TimeoutError
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            return executor.submit(func, *args, **kwargs).result(timeout=timeout)
+        finally:
+            executor.shutdown(wait=False)
+    
+    def _retry_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        计算重试等待时间
+        按异常类型区分失败原因：限流(HTTP 429)遵循Retry-After（上限为backoff_cap的2倍），超时额外等待，
+        其余错误使用带全抖动的指数退避，避免并发线程同时重试
+        """
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        
+        if isinstance(error, requests.exceptions.HTTPError):
+            response = error.response
+            if response is not None and response.status_code == 429:
+                try:
+                    retry_after = max(0.0, float(response.headers.get('Retry-After', self.rate_limit_backoff)))
+                except ValueError:
+                    retry_after = float(self.rate_limit_backoff)
+                # 工作线程等待期间页面也在等待，服务端要求的等待时间过长时限制上限
+                return min(retry_after, self.backoff_cap * 2)
+        elif isinstance(error, (requests.exceptions.Timeout, socket.timeout, FutureTimeoutError)):
+            return delay + self.timeout_backoff
+        
+        return delay
+    
+    def is_trading_day(self, trade_date: str) -> Optional[bool]:
+        """
+        判断是否为交易日
+        :return: True/False；日历获取失败或日期超出日历范围时返回None（不做拦截）
+        日历请求限制等待时间，失败后CALENDAR_RETRY_SECONDS秒内直接返回None，
+        避免日历接口不可用时每次获取数据都先等待超时
+        """
+        global _calendar_failed_until
+        if time.time() < _calendar_failed_until:
+            return None
+        
+        try:
+            trade_dates, last_date = self._call_with_timeout(_get_trade_calendar, self.timeout)
+        except Exception:
+            # cache_resource不缓存异常，在模块级记录失败时间
+            _calendar_failed_until = time.time() + CALENDAR_RETRY_SECONDS
+            return None
+        if trade_date > last_date:
+            return None
+        return trade_date in trade_dates
+    
     def fetch_position_data_with_fallback(self, trade_date: str, progress_callback=None) -> bool:
         """获取持仓数据，包含备用方案"""
         
@@ -77,84 +297,68 @@ class CloudDataFetcher:
             st.error("akshare未安装，请联系管理员")
             return False
         
+        # 非交易日没有持仓数据，直接返回，避免逐个交易所超时重试
+        if self.is_trading_day(trade_date) is False:
+            st.warning(f"⚠️ {trade_date} 不是交易日，请选择其他日期")
+            return False
+        
         success_count = 0
-        total_exchanges = 5
-        
-        # 交易所配置 - 按成功率排序
-        exchanges = [
-            {
-                "name": "大商所",
-                "func": ak.futures_dce_position_rank,
-                "filename": "大商所持仓.xlsx",
-                "args": {"date": trade_date}
-            },
-            {
-                "name": "中金所", 
-                "func": ak.get_cffex_rank_table,
-                "filename": "中金所持仓.xlsx",
-                "args": {"date": trade_date}
-            },
-            {
-                "name": "郑商所",
-                "func": ak.get_czce_rank_table,
-                "filename": "郑商所持仓.xlsx", 
-                "args": {"date": trade_date}
-            },
-            {
-                "name": "上期所",
-                "func": ak.get_shfe_rank_table,
-                "filename": "上期所持仓.xlsx",
-                "args": {"date": trade_date}
-            },
-            {
-                "name": "广期所",
-                "func": ak.futures_gfex_position_rank,
-                "filename": "广期所持仓.xlsx",
-                "args": {"date": trade_date}
-            }
-        ]
+        total_exchanges = len(POSITION_EXCHANGES)
         
         # 确保数据目录存在
         data_dir = "data"
         os.makedirs(data_dir, exist_ok=True)
         
-        for i, exchange in enumerate(exchanges):
-            if progress_callback:
-                progress = i / total_exchanges * 0.6
-                progress_callback(f"正在获取 {exchange['name']} 数据...", progress)
-            
-            try:
-                st.info(f"🔄 正在获取 {exchange['name']} 数据...")
+        # 进度消息集中在一个状态容器中更新，避免每条消息都触发一次前端重绘
+        with st.status(f"🔄 正在并发获取 {total_exchanges} 个交易所数据...", expanded=False) as status:
+            # 各交易所访问不同的数据源，并发获取即可，无需请求间隔
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(self._fetch_one, exchange, trade_date, data_dir) for exchange in POSITION_EXCHANGES]
                 
-                # 使用安全调用
-                data_dict = self.safe_akshare_call(exchange['func'], **exchange['args'])
-                
-                if data_dict:
-                    # 保存数据
-                    save_path = os.path.join(data_dir, exchange['filename'])
-                    with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
-                        for sheet_name, df in data_dict.items():
-                            # 清理sheet名称
-                            clean_name = sheet_name[:31].replace("/", "-").replace("*", "")
-                            df.to_excel(writer, sheet_name=clean_name, index=False)
+                for completed, future in enumerate(as_completed(futures), 1):
+                    name, data_dict, error = future.result()
                     
-                    st.success(f"✅ {exchange['name']} 数据获取成功")
-                    success_count += 1
-                else:
-                    st.warning(f"⚠️ {exchange['name']} 数据获取失败，但不影响其他交易所")
+                    if progress_callback:
+                        progress = completed / total_exchanges * 0.6
+                        progress_callback(f"已完成 {name} 数据获取", progress)
                     
-            except Exception as e:
-                st.warning(f"⚠️ {exchange['name']} 数据获取失败: {str(e)}")
-                continue
+                    # 以是否返回数据判断成败：部分异常（如超时）的错误信息为空字符串
+                    if data_dict is None:
+                        st.write(f"⚠️ {name} 数据获取失败，但不影响其他交易所: {error}")
+                    else:
+                        st.write(f"✅ {name} 数据获取成功")
+                        success_count += 1
+                    status.update(label=f"🔄 正在获取持仓数据: {completed}/{total_exchanges}")
             
-            # 添加请求间隔
-            time.sleep(self.delay_between_requests)
+            status.update(
+                label=f"持仓数据获取完成: {success_count}/{total_exchanges} 个交易所成功",
+                state="complete" if success_count > 0 else "error",
+                expanded=success_count < total_exchanges
+            )
         
         if progress_callback:
             progress_callback("持仓数据获取完成", 0.6)
         
         return success_count > 0
     
+    def _fetch_one(self, exchange: Dict[str, str], trade_date: str, data_dir: str) -> Tuple[str, Optional[Dict[str, pd.DataFrame]], Optional[str]]:
+        """
+        获取并保存单个交易所持仓数据（在工作线程中执行）
+        :return: (交易所名称, 数据字典或None, 错误信息或None)
+        """
+        try:
+            data_dict = _fetch_one_exchange(exchange['name'], trade_date)
+            
+            # 分析引擎从数据目录加载持仓数据，以Parquet格式保存到交易所子目录
+            # （不同交易所写入不同目录，可并发执行）
+            if not save_sheets_parquet(data_dict, os.path.join(data_dir, exchange['name'])):
+                return exchange['name'], None, "数据保存失败"
+            
+            return exchange['name'], data_dict, None
+            
+        except Exception as e:
+            return exchange['name'], None, str(e) or type(e).__name__
+    
     def fetch_price_data_with_fallback(self, trade_date: str, progress_callback=None) -> pd.DataFrame:
         """获取期货行情数据，包含备用方案"""
         
@@ -164,49 +368,58 @@ class CloudDataFetcher:
             st.error("akshare未安装，请联系管理员")
             return pd.DataFrame()
         
-        price_exchanges = [
-            {"market": "DCE", "name": "大商所"},
-            {"market": "CFFEX", "name": "中金所"},
-            {"market": "CZCE", "name": "郑商所"},
-            {"market": "SHFE", "name": "上期所"},
-        ]
-        
         all_data = []
         
-        for i, exchange in enumerate(price_exchanges):
-            if progress_callback:
-                progress = 0.6 + (i / len(price_exchanges)) * 0.2
-                progress_callback(f"正在获取 {exchange['name']} 行情数据...", progress)
-            
-            try:
-                st.info(f"🔄 正在获取 {exchange['name']} 行情数据...")
-                
-                # 使用安全调用
-                df = self.safe_akshare_call(
-                    ak.get_futures_daily,
-                    start_date=trade_date,
-                    end_date=trade_date,
-                    market=exchange["market"]
-                )
+        total_exchanges = len(PRICE_EXCHANGES)
+        
+        with st.status(f"🔄 正在并发获取 {total_exchanges} 个交易所行情数据...", expanded=False) as status:
+            # get_futures_daily每次只能查询一个市场，四个市场分属不同交易所站点，
+            # 一次性全部并发提交，相当于一轮请求完成
+            with ThreadPoolExecutor(max_workers=total_exchanges) as executor:
+                futures = [
+                    executor.submit(self._fetch_price, exchange, trade_date)
+                    for exchange in PRICE_EXCHANGES
+                ]
                 
-                if df is not None and not df.empty:
-                    df['exchange'] = exchange["name"]
-                    all_data.append(df)
-                    st.success(f"✅ {exchange['name']} 行情数据获取成功")
-                else:
-                    st.warning(f"⚠️ {exchange['name']} 行情数据为空")
+                for completed, future in enumerate(as_completed(futures), 1):
+                    name, df, error = future.result()
                     
-            except Exception as e:
-                st.warning(f"⚠️ {exchange['name']} 行情数据获取失败: {str(e)}")
-                continue
+                    if progress_callback:
+                        progress = 0.6 + (completed / total_exchanges) * 0.2
+                        progress_callback(f"已完成 {name} 行情数据获取", progress)
+                    
+                    if df is None:
+                        st.write(f"⚠️ {name} 行情数据获取失败: {error}")
+                    else:
+                        all_data.append(df)
+                        st.write(f"✅ {name} 行情数据获取成功")
+                    status.update(label=f"🔄 正在获取行情数据: {completed}/{total_exchanges}")
             
-            # 添加请求间隔
-            time.sleep(self.delay_between_requests)
+            status.update(
+                label=f"行情数据获取完成: {len(all_data)}/{total_exchanges} 个交易所成功",
+                state="complete" if all_data else "error",
+                expanded=len(all_data) < total_exchanges
+            )
         
         if progress_callback:
             progress_callback("行情数据获取完成", 0.8)
         
-        return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+        return pd.concat(all_data, ignore_index=True, copy=False) if all_data else pd.DataFrame()
+    
+    def _fetch_price(self, exchange: Dict[str, str], trade_date: str) -> Tuple[str, Optional[pd.DataFrame], Optional[str]]:
+        """
+        获取单个交易所行情数据（在工作线程中执行）
+        :return: (交易所名称, 行情数据或None, 错误信息或None)
+        """
+        try:
+            # 缓存中的DataFrame是共享对象，复制后再添加列
+            df = _fetch_price_one(exchange["market"], trade_date).copy()
+            # 交易所列使用分类类型，各交易所类别一致，合并后仍保持分类
+            df['exchange'] = pd.Categorical([exchange["name"]] * len(df), categories=PRICE_EXCHANGE_NAMES)
+            return exchange["name"], df, None
+            
+        except Exception as e:
+            return exchange["name"], None, str(e) or type(e).__name__
     
     def create_demo_data(self, trade_date: str) -> bool:
         """创建演示数据（当所有数据源都失败时）"""
@@ -217,38 +430,42 @@ class CloudDataFetcher:
         
         # 创建演示持仓数据
         demo_contracts = ['螺纹钢2501', '铁矿石2501', '豆粕2501', '玉米2501', '白糖2501']
+        party_names = [f'期货公司{i+1}' for i in range(20)]
         
         for exchange_name in ['大商所', '中金所', '郑商所', '上期所', '广期所']:
-            filename = f"{exchange_name}持仓.xlsx"
-            save_path = os.path.join(data_dir, filename)
-            
             # 创建演示数据
             demo_data = {}
             for contract in demo_contracts:
-                # 生成随机但合理的持仓数据
-                np.random.seed(hash(contract + trade_date) % 2**32)
-                
-                data = []
-                for i in range(20):  # 前20名
-                    data.append({
-                        'long_party_name': f'期货公司{i+1}',
-                        'long_open_interest': np.random.randint(1000, 50000),
-                        'long_open_interest_chg': np.random.randint(-5000, 5000),
-                        'short_party_name': f'期货公司{i+1}',
-                        'short_open_interest': np.random.randint(1000, 50000),
-                        'short_open_interest_chg': np.random.randint(-5000, 5000),
-                    })
+                # 生成随机但合理的持仓数据（前20名，按列批量生成）
+                # 字符串hash()每个进程随机加盐，用crc32得到跨进程稳定的种子
+                rng = np.random.default_rng(zlib.crc32(f"{contract}{trade_date}".encode('utf-8')))
                 
-                demo_data[contract] = pd.DataFrame(data)
+                demo_data[contract] = pd.DataFrame({
+                    'long_party_name': party_names,
+                    'long_open_interest': rng.integers(1000, 50000, size=20),
+                    'long_open_interest_chg': rng.integers(-5000, 5000, size=20),
+                    'short_party_name': party_names,
+                    'short_open_interest': rng.integers(1000, 50000, size=20),
+                    'short_open_interest_chg': rng.integers(-5000, 5000, size=20),
+                })
             
             # 保存演示数据
-            with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
-                for sheet_name, df in demo_data.items():
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+            save_sheets_parquet(demo_data, os.path.join(data_dir, exchange_name))
         
         st.info("✅ 演示数据创建完成，您可以体验系统功能")
         return True
     
+    def _probe_url(self, url: str) -> int:
+        """
+        探测URL连通性，返回状态码
+        优先使用HEAD避免下载页面内容；服务器不支持HEAD时退回流式GET，只读取响应头
+        """
+        response = self.session.head(url, timeout=5, allow_redirects=True)
+        if response.status_code == 405:
+            response = self.session.get(url, timeout=5, stream=True)
+            response.close()
+        return response.status_code
+    
     def diagnose_network_issues(self):
         """诊断网络问题"""
         st.subheader("🔍 网络诊断")
@@ -260,22 +477,41 @@ class CloudDataFetcher:
             ("akshare官网", "https://akshare.akfamily.xyz")
         ]
         
-        for name, url in test_urls:
-            try:
-                response = requests.get(url, timeout=10)
-                if response.status_code == 200:
-                    st.success(f"✅ {name} 连接正常")
+        with st.status("🔄 正在检测网络连接...", expanded=True) as status:
+            # 并发探测，按原顺序展示结果
+            with ThreadPoolExecutor(max_workers=len(test_urls)) as executor:
+                future_to_name = {executor.submit(self._probe_url, url): name for name, url in test_urls}
+                results = {}
+                for future in as_completed(future_to_name):
+                    try:
+                        results[future_to_name[future]] = future.result()
+                    except Exception as e:
+                        results[future_to_name[future]] = e
+            
+            failed = 0
+            for name, _ in test_urls:
+                result = results[name]
+                if isinstance(result, Exception):
+                    st.write(f"❌ {name} 连接失败: {str(result)}")
+                    failed += 1
+                elif result == 200:
+                    st.write(f"✅ {name} 连接正常")
                 else:
-                    st.warning(f"⚠️ {name} 连接异常 (状态码: {response.status_code})")
-            except Exception as e:
-                st.error(f"❌ {name} 连接失败: {str(e)}")
-        
-        # 测试akshare导入
-        try:
-            import akshare as ak
-            st.success(f"✅ akshare 导入成功 (版本: {getattr(ak, '__version__', '未知')})")
-        except ImportError:
-            st.error("❌ akshare 导入失败")
+                    st.write(f"⚠️ {name} 连接异常 (状态码: {result})")
+                    failed += 1
+            
+            # 测试akshare导入
+            try:
+                import akshare as ak
+                st.write(f"✅ akshare 导入成功 (版本: {getattr(ak, '__version__', '未知')})")
+            except ImportError:
+                st.write("❌ akshare 导入失败")
+                failed += 1
+            
+            status.update(
+                label="网络诊断完成" if failed == 0 else f"网络诊断完成: {failed} 项异常",
+                state="complete" if failed == 0 else "error"
+            )
         
         # 提供解决建议
         st.markdown("""
@@ -296,5 +532,7 @@ class CloudDataFetcher:
            - 解决方案: 本地运行或使用演示模式
         """)
 
-# 全局实例
-cloud_fetcher = CloudDataFetcher() 
\ No newline at end of file
+@st.cache_resource
+def get_cloud_fetcher() -> CloudDataFetcher:
+    """获取全局云端数据获取器（跨脚本重跑复用同一连接池）"""
+    return CloudDataFetcher()
\ No newline at end of file
@@ -11,15 +11,158 @@ import akshare as ak
 import pandas as pd
 import numpy as np
 import os
+import hashlib
+import pickle
 import warnings
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 from typing import Dict, List, Tuple, Optional, Any
+from functools import lru_cache
+from collections import defaultdict
+import heapq
 import re
+from utils import save_sheets_parquet, load_sheets_parquet, clean_sheet_name, dedupe_columns
+
+try:
+    from numba import njit, types as nb_types
+except ImportError:  # numba为可选依赖，未安装时使用纯NumPy实现
+    njit = None
 
 warnings.filterwarnings('ignore')
 
+# 各策略保留的信号数量（前十名）
+TOP_SIGNALS = 10
+
+# 持仓数据分析必需的列
+REQUIRED_COLUMNS = frozenset({'long_party_name', 'long_open_interest', 'long_open_interest_chg',
+                              'short_party_name', 'short_open_interest', 'short_open_interest_chg', 'vol'})
+
+# 持仓数据中需要转换为数值的列
+NUMERIC_COLUMNS = ['long_open_interest', 'long_open_interest_chg',
+                   'short_open_interest', 'short_open_interest_chg', 'vol']
+
+# 持仓变化列（缺失值按0处理）
+CHANGE_COLUMNS = ['long_open_interest_chg', 'short_open_interest_chg']
+
+def _clean_numeric(series: pd.Series) -> pd.Series:
+    """转换为数值列：已是数值类型直接返回，否则一次去除千分位逗号和空白后转换"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    cleaned = series.astype('string').str.replace(r'[,\s]+', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce')
+
+# 匹配非字母字符（数字、下划线、符号），中文品种名按字母保留
+_NON_ALPHA_RE = re.compile(r'[\W\d_]+')
+
+@lru_cache(maxsize=4096)
+def extract_symbol(contract: str) -> str:
+    """提取品种代码"""
+    symbol_part = contract.rsplit('_', 1)[-1]
+    symbol = _NON_ALPHA_RE.sub('', symbol_part).upper()
+    return symbol if symbol else contract
+
+def _rows_to_frame(rows: List[Tuple]) -> pd.DataFrame:
+    """
+    将工作表的行数据（首行为表头）转换为DataFrame
+    表头处理与pd.read_excel一致：空表头记为"Unnamed: i"，重复列名依次加".1"、".2"后缀
+    （郑商所数据依赖open_inten.1等列名区分多空）
+    """
+    if not rows:
+        return pd.DataFrame()
+    
+    df = pd.DataFrame(rows[1:], columns=dedupe_columns(rows[0]))
+    # 空单元格与pd.read_excel一样记为缺失值，并去掉只读模式可能多读出的空行
+    return df.replace('', np.nan).dropna(how='all').reset_index(drop=True)
+
+def _read_xlsx_fast(file_path: str) -> Dict[str, pd.DataFrame]:
+    """
+    读取Excel全部数据表
+    依次尝试python-calamine（Rust实现，最快）、openpyxl只读流式模式，
+    最后才使用pd.read_excel
+    :param file_path: Excel文件路径
+    :return: {数据表名称: DataFrame}
+    """
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        pass
+    else:
+        workbook = CalamineWorkbook.from_path(file_path)
+        return {
+            name: _rows_to_frame(workbook.get_sheet_by_name(name).to_python())
+            for name in workbook.sheet_names
+        }
+    
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        pass
+    else:
+        # 只读模式按行流式读取，不加载样式等格式信息
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            return {
+                worksheet.title: _rows_to_frame(list(worksheet.iter_rows(values_only=True)))
+                for worksheet in workbook.worksheets
+            }
+        finally:
+            workbook.close()
+    
+    return pd.read_excel(file_path, sheet_name=None)
+
+# 郑商所持仓数据列名映射
+_CZCE_RENAME = {
+    'g_party_n': 'long_party_name',
+    'open_inten': 'long_open_interest',
+    'inten_intert': 'long_open_interest_chg',
+    't_party_n': 'short_party_name',
+    'open_inten.1': 'short_open_interest',
+    'inten_intert.1': 'short_open_interest_chg',
+}
+
+def _standardize_columns(df: pd.DataFrame, exchange_name: Optional[str] = None) -> pd.DataFrame:
+    """
+    标准化列名
+    :param df: 原始持仓数据
+    :param exchange_name: 交易所名称；已知交易所时只对郑商所做映射，
+                          未知来源时按列名判断是否为郑商所格式
+    """
+    if exchange_name is not None and exchange_name != "郑商所":
+        return df
+    if 'g_party_n' in df.columns:
+        df = df.rename(columns=_CZCE_RENAME)
+    return df
+
+def _msd(long_arr: np.ndarray, short_arr: np.ndarray, vol_arr: np.ndarray) -> float:
+    """
+    蜘蛛网策略MSD计算：按知情度 (多单+空单)/成交量 从高到低排序，
+    前40%（至少2个）为知情者，其余为非知情者，
+    返回两组 (多单-空单)/(多单+空单) 均值之差；任一组无有效数据时返回NaN
+    """
+    total = long_arr + short_arr
+    order = np.argsort(-(total / vol_arr), kind='mergesort')
+    cutoff = max(2, int(len(order) * 0.4))
+    
+    its_idx = order[:cutoff]
+    uts_idx = order[cutoff:]
+    its_idx = its_idx[total[its_idx] > 0]
+    uts_idx = uts_idx[total[uts_idx] > 0]
+    if len(its_idx) == 0 or len(uts_idx) == 0:
+        return np.nan
+    
+    its_mean = ((long_arr[its_idx] - short_arr[its_idx]) / total[its_idx]).mean()
+    uts_mean = ((long_arr[uts_idx] - short_arr[uts_idx]) / total[uts_idx]).mean()
+    return its_mean - uts_mean
+
+if njit is not None:
+    # 指定签名在导入时编译，cache=True将编译结果缓存到磁盘，后续启动无需重新编译；
+    # nogil=True使多个分析线程可以同时执行该函数。
+    # 参数声明为只读、任意内存布局的数组：pandas写时复制模式下to_numpy返回只读视图，
+    # 只接受可写数组的签名会导致每次调用都匹配失败；可写数组也能传入该签名
+    _ro_array = nb_types.Array(nb_types.float64, 1, 'A', readonly=True)
+    _msd = njit(nb_types.float64(_ro_array, _ro_array, _ro_array), cache=True, nogil=True)(_msd)
+
 class FuturesDataManager:
     """期货数据管理器 - 负责数据获取和缓存"""
     
@@ -63,50 +206,86 @@ class FuturesDataManager:
             {"market": "CZCE", "name": "郑商所"},
             {"market": "SHFE", "name": "上期所"},
         ]
+        self.price_exchange_names = [exchange["name"] for exchange in self.price_exchanges]
     
     def ensure_data_directory(self):
         """确保数据目录存在"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
     
-    def fetch_position_data(self, trade_date: str, progress_callback=None) -> bool:
+    def fetch_position_data(self, trade_date: str, progress_callback=None, export_excel: bool = False) -> bool:
         """
         获取持仓数据
         :param trade_date: 交易日期 YYYYMMDD
         :param progress_callback: 进度回调函数
+        :param export_excel: 是否同时导出Excel文件（供用户下载）
         :return: 是否成功
         """
         success_count = 0
         total_exchanges = len(self.exchange_config)
         
-        for i, (exchange_name, config) in enumerate(self.exchange_config.items()):
-            try:
-                if progress_callback:
-                    progress_callback(f"正在获取{exchange_name}数据...", (i + 1) / total_exchanges * 0.6)
-                
-                # 获取数据
-                data_dict = config["func"](date=trade_date)
-                
-                if data_dict:
-                    # 保存到Excel
-                    save_path = os.path.join(self.data_dir, config['filename'])
-                    with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
-                        for sheet_name, df in data_dict.items():
-                            # 清理sheet名称
-                            clean_name = sheet_name[:31].replace("/", "-").replace("*", "")
-                            df.to_excel(writer, sheet_name=clean_name, index=False)
-                    
+        # 各交易所接口相互独立且为网络I/O，并发获取，总耗时取决于最慢的交易所
+        with ThreadPoolExecutor(max_workers=total_exchanges) as executor:
+            future_to_name = {
+                executor.submit(self._fetch_and_save_one, exchange_name, config, trade_date, export_excel): exchange_name
+                for exchange_name, config in self.exchange_config.items()
+            }
+            
+            for completed, future in enumerate(as_completed(future_to_name), 1):
+                exchange_name = future_to_name[future]
+                if future.result():
                     success_count += 1
-                    
-            except Exception as e:
-                print(f"获取{exchange_name}数据失败: {str(e)}")
-                continue
+                
+                if progress_callback:
+                    progress_callback(f"已完成{exchange_name}数据获取", completed / total_exchanges * 0.6)
         
         if progress_callback:
             progress_callback("持仓数据获取完成", 0.6)
         
         return success_count > 0
     
+    def _fetch_and_save_one(self, exchange_name: str, config: Dict[str, Any], trade_date: str, export_excel: bool = False) -> bool:
+        """
+        获取并保存单个交易所持仓数据（在工作线程中执行）
+        :return: 是否成功
+        """
+        try:
+            data_dict = config["func"](date=trade_date)
+            return bool(data_dict) and self._save_sheets(exchange_name, data_dict, export_excel)
+        except Exception as e:
+            print(f"获取{exchange_name}数据失败: {str(e)}")
+            return False
+    
+    def _save_sheets(self, exchange_name: str, data_dict: Dict[str, pd.DataFrame], export_excel: bool = False) -> bool:
+        """
+        保存交易所持仓数据
+        默认保存为Parquet（每个交易所一个子目录），分析时从该目录加载；
+        export_excel为True时额外写出Excel文件供用户下载
+        :param exchange_name: 交易所名称
+        :param data_dict: {合约名称: DataFrame}
+        :param export_excel: 是否同时导出Excel
+        :return: 是否成功
+        """
+        if not save_sheets_parquet(data_dict, os.path.join(self.data_dir, exchange_name)):
+            return False
+        
+        if export_excel:
+            file_path = os.path.join(self.data_dir, self.exchange_config[exchange_name]['filename'])
+            try:
+                # xlsxwriter写入速度快于openpyxl；不启用constant_memory模式：
+                # to_excel按列写出单元格，该模式只保留当前行，会丢失其余行的数据。
+                # 关闭网址识别，避免逐个字符串做正则匹配
+                with pd.ExcelWriter(
+                    file_path, engine='xlsxwriter',
+                    engine_kwargs={'options': {'strings_to_urls': False}}
+                ) as writer:
+                    for sheet_name, df in data_dict.items():
+                        df.to_excel(writer, sheet_name=clean_sheet_name(sheet_name), index=False)
+            except Exception as e:
+                print(f"导出{exchange_name}Excel失败: {str(e)}")
+        
+        return True
+    
     def fetch_price_data(self, trade_date: str, progress_callback=None) -> pd.DataFrame:
         """
         获取期货行情数据
@@ -115,43 +294,130 @@ class FuturesDataManager:
         :return: 合并后的价格数据
         """
         all_data = []
+        total_exchanges = len(self.price_exchanges)
         
-        for i, exchange in enumerate(self.price_exchanges):
-            try:
-                if progress_callback:
-                    progress_callback(f"正在获取{exchange['name']}行情数据...", 0.6 + (i / len(self.price_exchanges)) * 0.2)
-                
-                df = ak.get_futures_daily(start_date=trade_date, end_date=trade_date, market=exchange["market"])
-                if not df.empty:
-                    df['exchange'] = exchange["name"]
+        with ThreadPoolExecutor(max_workers=total_exchanges) as executor:
+            future_to_name = {
+                executor.submit(self._fetch_price_one, exchange, trade_date): exchange["name"]
+                for exchange in self.price_exchanges
+            }
+            
+            for completed, future in enumerate(as_completed(future_to_name), 1):
+                df = future.result()
+                if df is not None:
                     all_data.append(df)
-                    
-            except Exception as e:
-                print(f"获取{exchange['name']}行情数据失败: {str(e)}")
-                continue
+                
+                if progress_callback:
+                    progress_callback(f"已完成{future_to_name[future]}行情数据获取", 0.6 + (completed / total_exchanges) * 0.2)
         
         if progress_callback:
             progress_callback("行情数据获取完成", 0.8)
         
-        return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+        return pd.concat(all_data, ignore_index=True, copy=False) if all_data else pd.DataFrame()
+    
+    def _fetch_price_one(self, exchange: Dict[str, str], trade_date: str) -> Optional[pd.DataFrame]:
+        """
+        获取单个交易所行情数据（在工作线程中执行）
+        :return: 行情数据，失败或无数据时返回None
+        """
+        try:
+            df = ak.get_futures_daily(start_date=trade_date, end_date=trade_date, market=exchange["market"])
+            if not df.empty:
+                # 交易所列使用分类类型，各交易所类别一致，合并后仍保持分类
+                df['exchange'] = pd.Categorical([exchange["name"]] * len(df), categories=self.price_exchange_names)
+                return df
+        except Exception as e:
+            print(f"获取{exchange['name']}行情数据失败: {str(e)}")
+        return None
     
     def load_position_data(self) -> Dict[str, pd.DataFrame]:
-        """加载已保存的持仓数据"""
+        """加载已保存的持仓数据（优先读取Parquet目录，兼容旧的Excel文件）"""
         all_data = {}
         
         for exchange_name, config in self.exchange_config.items():
+            parquet_dir = os.path.join(self.data_dir, exchange_name)
             file_path = os.path.join(self.data_dir, config['filename'])
-            if os.path.exists(file_path):
+            if os.path.isdir(parquet_dir):
+                data_dict = load_sheets_parquet(parquet_dir)
+            elif os.path.exists(file_path):
                 try:
-                    data_dict = pd.read_excel(file_path, sheet_name=None)
-                    for sheet_name, df in data_dict.items():
-                        contract_key = f"{exchange_name}_{sheet_name}"
-                        all_data[contract_key] = df
+                    data_dict = self._cached_read_excel(file_path)
                 except Exception as e:
                     print(f"读取{exchange_name}数据失败: {str(e)}")
                     continue
+            else:
+                continue
+            
+            all_data.update(self._clean_exchange_sheets(exchange_name, data_dict))
         
         return all_data
+    
+    def _clean_exchange_sheets(self, exchange_name: str, data_dict: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        批量清洗单个交易所的全部合约数据
+        各合约只有几十行，逐个合约做字符串清洗和数值转换的调用开销远大于计算本身；
+        这里把同一交易所的合约拼接成一张长表，一次完成列名标准化和数值转换，再按合约拆分
+        :param exchange_name: 交易所名称
+        :param data_dict: {合约名称: 原始DataFrame}
+        :return: {交易所_合约: 清洗后的DataFrame}
+        """
+        contract_keys = [f"{exchange_name}_{sheet_name}" for sheet_name in data_dict]
+        frames = [_standardize_columns(df, exchange_name) for df in data_dict.values()]
+        if not frames:
+            return {}
+        
+        try:
+            combined = pd.concat(frames, ignore_index=True)
+            for col in NUMERIC_COLUMNS:
+                if col in combined.columns:
+                    combined[col] = _clean_numeric(combined[col])
+            
+            # 各行所属合约，按合约分组拆回
+            row_keys = np.repeat(contract_keys, [len(df) for df in frames])
+            groups = dict(iter(combined.groupby(row_keys, sort=False)))
+        except Exception as e:
+            print(f"批量清洗{exchange_name}数据失败: {str(e)}")
+            return dict(zip(contract_keys, frames))
+        
+        # 拆回时只保留该合约原有的列，空表保持原样
+        return {
+            key: groups[key][df.columns].reset_index(drop=True) if key in groups else df
+            for key, df in zip(contract_keys, frames)
+        }
+
+    def _cached_read_excel(self, file_path: str) -> Dict[str, pd.DataFrame]:
+        """
+        读取Excel全部数据表，结果按文件内容哈希缓存到 data/.cache
+        文件内容变化时哈希随之变化，旧缓存自动失效
+        :param file_path: Excel文件路径
+        :return: {数据表名称: DataFrame}
+        """
+        with open(file_path, 'rb') as f:
+            file_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+        
+        cache_dir = os.path.join(self.data_dir, ".cache")
+        cache_path = os.path.join(cache_dir, f"{file_hash}_{os.path.basename(file_path)}.pkl")
+        
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                print(f"读取缓存失败，重新解析Excel: {str(e)}")
+        
+        data_dict = _read_xlsx_fast(file_path)
+        
+        # 先写临时文件再替换，避免并发读取到写了一半的缓存
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"写入缓存失败: {str(e)}")
+        
+        return data_dict
 
 class StrategyAnalyzer:
     """策略分析器 - 包含所有分析策略"""
@@ -160,38 +426,44 @@ class StrategyAnalyzer:
         # 家人席位定义：可配置
         if retail_seats is None:
             from config import STRATEGY_CONFIG
-            self.retail_seats = STRATEGY_CONFIG["家人席位反向操作策略"]["default_retail_seats"]
-        else:
-            self.retail_seats = retail_seats
+            retail_seats = STRATEGY_CONFIG["家人席位反向操作策略"]["default_retail_seats"]
+        self.update_retail_seats(retail_seats)
     
     def update_retail_seats(self, retail_seats: List[str]):
         """更新家人席位配置"""
         self.retail_seats = retail_seats
+        # 预先计算去重后的有序席位列表和集合，分析每个合约时直接复用
+        self._retail_order = list(dict.fromkeys(retail_seats))
+        self._retail_set = frozenset(self._retail_order)
     
-    def process_position_data(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    def process_position_data(self, df: pd.DataFrame, exchange_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         处理单个合约的持仓数据
         :param df: 原始持仓数据
+        :param exchange_name: 交易所名称，用于选择列名映射
         :return: 处理后的数据字典
         """
         try:
             # 自动适配不同交易所的列名
-            df = self._standardize_columns(df)
-            
-            required_columns = ['long_party_name', 'long_open_interest', 'long_open_interest_chg',
-                              'short_party_name', 'short_open_interest', 'short_open_interest_chg', 'vol']
+            df = self._standardize_columns(df, exchange_name)
             
-            if not all(col in df.columns for col in required_columns):
+            if not REQUIRED_COLUMNS.issubset(df.columns):
                 return None
             
             # 数据类型转换 - 处理所有数据，不限制前20名
-            df = df.copy()
-            numeric_columns = ['long_open_interest', 'long_open_interest_chg',
-                             'short_open_interest', 'short_open_interest_chg', 'vol']
+            # load_position_data已按交易所批量转换，这里只处理尚未转换的列
+            updates = {col: _clean_numeric(df[col]) for col in NUMERIC_COLUMNS
+                       if not pd.api.types.is_numeric_dtype(df[col])}
             
-            for col in numeric_columns:
-                df[col] = df[col].astype(str).str.replace(',', '').str.replace(' ', '').replace({'nan': None})
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            # 持仓变化缺失按0处理（求和本来就忽略缺失值），后续聚合无需再判断缺失；
+            # 持仓量保留缺失值，蜘蛛网策略需要据此排除无效席位
+            for col in CHANGE_COLUMNS:
+                series = updates.get(col, df[col])
+                if series.isna().any():
+                    updates[col] = series.fillna(0.0).astype(np.float64, copy=False)
+            
+            if updates:
+                df = df.assign(**updates)
             
             # 计算汇总数据
             total_long = df['long_open_interest'].sum()
@@ -211,21 +483,9 @@ class StrategyAnalyzer:
             print(f"处理持仓数据失败: {str(e)}")
             return None
     
-    def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _standardize_columns(self, df: pd.DataFrame, exchange_name: Optional[str] = None) -> pd.DataFrame:
         """标准化列名"""
-        # 郑商所列名映射
-        if 'g_party_n' in df.columns:
-            df = df.rename(columns={
-                'g_party_n': 'long_party_name',
-                'open_inten': 'long_open_interest',
-                'inten_intert': 'long_open_interest_chg',
-                't_party_n': 'short_party_name',
-                'open_inten.1': 'short_open_interest',
-                'inten_intert.1': 'short_open_interest_chg',
-                'vol': 'vol'
-            })
-        
-        return df
+        return _standardize_columns(df, exchange_name)
     
     def analyze_power_change(self, data: Dict[str, Any]) -> Tuple[str, str, float]:
         """多空力量变化策略"""
@@ -246,6 +506,32 @@ class StrategyAnalyzer:
         except Exception as e:
             return "错误", f"数据处理错误：{str(e)}", 0
     
+    def analyze_power_change_batch(self, totals_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        多空力量变化策略（批量版本），一次计算所有合约的信号
+        :param totals_df: 包含 contract、total_long_chg、total_short_chg 列的汇总数据
+        :return: 以合约为索引，包含 signal、reason、strength 列的DataFrame
+        """
+        long_chg = totals_df['total_long_chg'].to_numpy(dtype=np.float64)
+        short_chg = totals_df['total_short_chg'].to_numpy(dtype=np.float64)
+        
+        is_long = (long_chg > 0) & (short_chg < 0)
+        is_short = (long_chg < 0) & (short_chg > 0)
+        signals = np.select([is_long, is_short], ["看多", "看空"], default="中性")
+        strengths = np.where(is_long | is_short, np.abs(long_chg) + np.abs(short_chg), 0.0)
+        
+        reasons = [
+            f"多单增加{lc:.0f}手，空单减少{abs(sc):.0f}手" if signal == "看多" else
+            f"多单减少{abs(lc):.0f}手，空单增加{sc:.0f}手" if signal == "看空" else
+            f"多单变化{lc:.0f}手，空单变化{sc:.0f}手"
+            for signal, lc, sc in zip(signals, long_chg, short_chg)
+        ]
+        
+        return pd.DataFrame(
+            {'signal': signals, 'reason': reasons, 'strength': strengths},
+            index=totals_df['contract']
+        )
+    
     def analyze_spider_web(self, data: Dict[str, Any]) -> Tuple[str, str, float]:
         """蜘蛛网策略"""
         try:
@@ -256,43 +542,21 @@ class StrategyAnalyzer:
                 (df['vol'].notna()) & (df['vol'] > 0) &
                 (df['long_open_interest'].notna()) & 
                 (df['short_open_interest'].notna())
-            ].copy()
+            ]
             
             if len(valid_seats) < 5:
                 return "中性", "有效席位数据不足", 0
             
-            # 计算知情度指标
-            valid_seats['stat'] = (valid_seats['long_open_interest'] + valid_seats['short_open_interest']) / valid_seats['vol']
-            
-            # 划分知情者和非知情者
-            sorted_seats = valid_seats.sort_values('stat', ascending=False)
-            cutoff_index = max(2, int(len(sorted_seats) * 0.4))
-            
-            its = sorted_seats.iloc[:cutoff_index]
-            uts = sorted_seats.iloc[cutoff_index:]
+            # 计算知情者与非知情者的持仓方向差异
+            msd = _msd(
+                valid_seats['long_open_interest'].to_numpy(dtype=np.float64),
+                valid_seats['short_open_interest'].to_numpy(dtype=np.float64),
+                valid_seats['vol'].to_numpy(dtype=np.float64)
+            )
             
-            # 计算ITS和UTS
-            its_values = []
-            uts_values = []
-            
-            for _, row in its.iterrows():
-                total_pos = row['long_open_interest'] + row['short_open_interest']
-                if total_pos > 0:
-                    its_val = (row['long_open_interest'] - row['short_open_interest']) / total_pos
-                    its_values.append(its_val)
-            
-            for _, row in uts.iterrows():
-                total_pos = row['long_open_interest'] + row['short_open_interest']
-                if total_pos > 0:
-                    uts_val = (row['long_open_interest'] - row['short_open_interest']) / total_pos
-                    uts_values.append(uts_val)
-            
-            if not its_values or not uts_values:
+            if np.isnan(msd):
                 return "中性", "计算数据不足", 0
             
-            # 计算MSD
-            msd = np.mean(its_values) - np.mean(uts_values)
-            
             if msd > 0.05:
                 return "看多", f"MSD={msd:.4f}，知情者明显看多", abs(msd)
             elif msd < -0.05:
@@ -308,71 +572,65 @@ class StrategyAnalyzer:
         try:
             df = data['raw_data']
             
-            # 统计家人席位的多空变化（合并同一席位）
-            seat_stats = {name: {'long_chg': 0, 'short_chg': 0, 'long_pos': 0, 'short_pos': 0} for name in self.retail_seats}
-            
-            for _, row in df.iterrows():
-                if row['long_party_name'] in self.retail_seats:
-                    seat_stats[row['long_party_name']]['long_chg'] += row['long_open_interest_chg'] if pd.notna(row['long_open_interest_chg']) else 0
-                    seat_stats[row['long_party_name']]['long_pos'] += row['long_open_interest'] if pd.notna(row['long_open_interest']) else 0
-                if row['short_party_name'] in self.retail_seats:
-                    seat_stats[row['short_party_name']]['short_chg'] += row['short_open_interest_chg'] if pd.notna(row['short_open_interest_chg']) else 0
-                    seat_stats[row['short_party_name']]['short_pos'] += row['short_open_interest'] if pd.notna(row['short_open_interest']) else 0
+            # 统计家人席位的多空变化（合并同一席位，按列向量化分组求和，缺失值按0计）
+            long_agg = (
+                df.loc[df['long_party_name'].isin(self._retail_set)]
+                .groupby('long_party_name', sort=False)[['long_open_interest_chg', 'long_open_interest']]
+                .sum()
+                .rename(columns={'long_open_interest_chg': 'long_chg', 'long_open_interest': 'long_pos'})
+            )
+            short_agg = (
+                df.loc[df['short_party_name'].isin(self._retail_set)]
+                .groupby('short_party_name', sort=False)[['short_open_interest_chg', 'short_open_interest']]
+                .sum()
+                .rename(columns={'short_open_interest_chg': 'short_chg', 'short_open_interest': 'short_pos'})
+            )
+            
+            seat_stats = (
+                pd.concat([long_agg, short_agg], axis=1)
+                .reindex(self._retail_order)
+                .fillna(0)
+                [['long_chg', 'short_chg', 'long_pos', 'short_pos']]
+            )
+            seat_stats.index.name = 'seat_name'
             
             # 只保留有持仓的席位（多单或空单有持仓）
-            active_seats = []
-            for seat, stats in seat_stats.items():
-                if stats['long_pos'] > 0 or stats['short_pos'] > 0:
-                    active_seats.append({
-                        'seat_name': seat, 
-                        'long_chg': stats['long_chg'], 
-                        'short_chg': stats['short_chg'],
-                        'long_pos': stats['long_pos'],
-                        'short_pos': stats['short_pos']
-                    })
-            
-            if not active_seats:
+            active = seat_stats.loc[(seat_stats['long_pos'] > 0) | (seat_stats['short_pos'] > 0)].reset_index()
+            
+            if active.empty:
                 return "中性", "未发现家人席位持仓", 0, []
             
+            active_seats = active.to_dict('records')
+            long_chg = active['long_chg']
+            short_chg = active['short_chg']
+            
             # 按照新的逻辑判断信号
             # 看多信号：所有家人席位的空单持仓量变化为正，且多单持仓量变化为负或0
             # 看空信号：所有家人席位的多单持仓量变化为正，且空单持仓量变化为负或0
-            
-            long_signal_conditions = []  # 看多信号条件
-            short_signal_conditions = []  # 看空信号条件
-            
-            for seat in active_seats:
-                long_chg = seat['long_chg']
-                short_chg = seat['short_chg']
-                
-                # 看多信号条件：空单增加(>0) 且 多单减少或不变(<=0)
-                long_condition = short_chg > 0 and long_chg <= 0
-                long_signal_conditions.append(long_condition)
-                
-                # 看空信号条件：多单增加(>0) 且 空单减少或不变(<=0)
-                short_condition = long_chg > 0 and short_chg <= 0
-                short_signal_conditions.append(short_condition)
+            all_long_condition = ((short_chg > 0) & (long_chg <= 0)).all()
+            all_short_condition = ((long_chg > 0) & (short_chg <= 0)).all()
             
             # 计算持仓占比
             total_position = df['long_open_interest'].sum() + df['short_open_interest'].sum()
-            retail_position = sum([seat['long_pos'] + seat['short_pos'] for seat in active_seats])
+            retail_position = active['long_pos'].sum() + active['short_pos'].sum()
             position_ratio = retail_position / total_position if total_position > 0 else 0
             
             # 判断信号
-            if len(active_seats) > 0 and all(long_signal_conditions):
+            if all_long_condition:
                 # 所有家人席位都满足看多条件
-                total_short_increase = sum([seat['short_chg'] for seat in active_seats if seat['short_chg'] > 0])
+                total_short_increase = short_chg[short_chg > 0].sum()
                 return "看多", f"家人席位空单增加{total_short_increase:.0f}手，多单减少或不变，持仓占比{position_ratio:.2%}", position_ratio, active_seats
-            elif len(active_seats) > 0 and all(short_signal_conditions):
+            elif all_short_condition:
                 # 所有家人席位都满足看空条件
-                total_long_increase = sum([seat['long_chg'] for seat in active_seats if seat['long_chg'] > 0])
+                total_long_increase = long_chg[long_chg > 0].sum()
                 return "看空", f"家人席位多单增加{total_long_increase:.0f}手，空单减少或不变，持仓占比{position_ratio:.2%}", position_ratio, active_seats
             else:
                 # 不满足条件
-                reason_parts = []
-                for seat in active_seats:
-                    if seat['long_chg'] != 0 or seat['short_chg'] != 0:
-                        reason_parts.append(f"{seat['seat_name']}(多{seat['long_chg']:+.0f},空{seat['short_chg']:+.0f})")
+                changed = active.loc[(long_chg != 0) | (short_chg != 0), ['seat_name', 'long_chg', 'short_chg']]
+                reason_parts = [
+                    f"{seat_name}(多{seat_long_chg:+.0f},空{seat_short_chg:+.0f})"
+                    for seat_name, seat_long_chg, seat_short_chg in changed.itertuples(index=False, name=None)
+                ]
                 
                 reason = f"家人席位持仓变化不符合策略条件: {', '.join(reason_parts)}" if reason_parts else "家人席位无明显变化"
                 return "中性", reason, 0, active_seats
@@ -401,7 +659,7 @@ class TermStructureAnalyzer:
             varieties = price_data['variety'].unique()
             
             for variety in varieties:
-                variety_data = price_data[price_data['variety'] == variety].copy()
+                variety_data = price_data[price_data['variety'] == variety]
                 
                 # 过滤有效数据
                 variety_data = variety_data[
@@ -419,11 +677,11 @@ class TermStructureAnalyzer:
                     continue
                 
                 contracts = variety_data['symbol'].tolist()
-                closes = variety_data['close'].tolist()
+                close_values = variety_data['close'].to_numpy(dtype=np.float64)
                 
                 # 判断期限结构
-                structure = self._determine_structure_strict(closes)
-                results.append((variety, structure, contracts, closes))
+                structure = self._determine_structure_strict(close_values)
+                results.append((variety, structure, contracts, close_values.tolist()))
             
             return results
             
@@ -434,55 +692,35 @@ class TermStructureAnalyzer:
     def _sort_contracts_by_month(self, variety_data: pd.DataFrame) -> pd.DataFrame:
         """按合约月份排序（从近月到远月）"""
         try:
-            # 提取合约月份信息
-            def extract_month_info(symbol):
-                # 匹配合约代码中的年月信息
-                match = re.search(r'(\d{4})$', symbol)  # 匹配末尾的4位数字（YYMM）
-                if match:
-                    yymm = match.group(1)
-                    year = int(yymm[:2])
-                    month = int(yymm[2:])
-                    
-                    # 处理年份（假设20xx年）
-                    if year < 50:  # 假设小于50的是20xx年
-                        year += 2000
-                    else:
-                        year += 1900
-                    
-                    return year * 100 + month
-                return 999999  # 无法解析的放到最后
-            
-            variety_data['sort_key'] = variety_data['symbol'].apply(extract_month_info)
-            variety_data = variety_data.sort_values('sort_key')
-            variety_data = variety_data.drop('sort_key', axis=1)
-            
-            return variety_data
+            # 取合约代码末尾4位数字（YYMM），按列向量化计算排序键
+            tail = variety_data['symbol'].astype(str).str[-4:]
+            yymm = pd.to_numeric(tail.where(tail.str.isdigit()), errors='coerce')
+            year = yymm // 100
+            month = yymm % 100
+            
+            # 处理年份（假设小于50的是20xx年），无法解析的放到最后
+            sort_key = np.nan_to_num(np.where(year < 50, year + 2000, year + 1900) * 100 + month, nan=999999)
+            
+            # 按位置重排，不在数据上添加临时列，也就无需先复制数据
+            return variety_data.iloc[np.argsort(sort_key, kind='stable')]
             
         except Exception as e:
             print(f"合约排序失败: {str(e)}")
             return variety_data.sort_values('symbol')  # 降级为按symbol排序
     
-    def _determine_structure_strict(self, prices: List[float]) -> str:
+    def _determine_structure_strict(self, prices: np.ndarray) -> str:
         """严格判断期限结构类型"""
-        if len(prices) < 2:
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.size < 2:
             return "flat"
         
-        # 严格判断：必须是严格递减或递增
-        is_strictly_decreasing = True
-        is_strictly_increasing = True
-        
-        for i in range(len(prices) - 1):
-            if prices[i] <= prices[i+1]:  # 不是严格递减
-                is_strictly_decreasing = False
-            if prices[i] >= prices[i+1]:  # 不是严格递增
-                is_strictly_increasing = False
-        
-        if is_strictly_decreasing:
+        # 严格判断：相邻价差必须全部小于0（严格递减）或全部大于0（严格递增）
+        diffs = np.diff(prices)
+        if (diffs < 0).all():
             return "back"  # 近强远弱（严格递减）
-        elif is_strictly_increasing:
+        if (diffs > 0).all():
             return "contango"  # 近弱远强（严格递增）
-        else:
-            return "flat"  # 不符合严格递减或递增的为平坦
+        return "flat"  # 不符合严格递减或递增的为平坦
 
 class FuturesAnalysisEngine:
     """期货分析引擎 - 主控制器"""
@@ -561,61 +799,97 @@ class FuturesAnalysisEngine:
             return None
     
     def _analyze_positions(self, position_data: Dict[str, pd.DataFrame], progress_callback=None) -> Dict[str, Any]:
-        """分析持仓数据"""
-        results = {}
+        """分析持仓数据（各合约相互独立，并发分析）"""
+        analyzed = {}
         total_contracts = len(position_data)
+        if total_contracts == 0:
+            return {}
         
-        for i, (contract_name, df) in enumerate(position_data.items()):
-            if progress_callback:
-                progress = 0.8 + (i / total_contracts) * 0.1
-                progress_callback(f"分析合约 {contract_name}...", progress)
-            
-            # 处理数据
-            processed_data = self.strategy_analyzer.process_position_data(df)
-            if not processed_data:
-                continue
-            
-            # 应用各种策略
-            strategies = {}
-            
-            # 多空力量变化策略
-            signal, reason, strength = self.strategy_analyzer.analyze_power_change(processed_data)
-            strategies['多空力量变化策略'] = {
-                'signal': signal,
-                'reason': reason,
-                'strength': strength
+        # pandas/NumPy的计算内核会释放GIL，线程池可以利用多核；
+        # 进度回调在当前线程中调用，无需额外加锁
+        with ThreadPoolExecutor(max_workers=min(total_contracts, os.cpu_count() or 1)) as executor:
+            future_to_name = {
+                executor.submit(self._analyze_one, contract_name, df): contract_name
+                for contract_name, df in position_data.items()
             }
             
-            # 蜘蛛网策略
-            signal, reason, strength = self.strategy_analyzer.analyze_spider_web(processed_data)
-            strategies['蜘蛛网策略'] = {
-                'signal': signal,
-                'reason': reason,
-                'strength': strength
-            }
-            
-            # 家人席位反向操作策略
-            signal, reason, strength, seat_details = self.strategy_analyzer.analyze_retail_reverse(processed_data)
-            strategies['家人席位反向操作策略'] = {
-                'signal': signal,
-                'reason': reason,
-                'strength': strength,
-                'seat_details': seat_details
-            }
-            
-            results[contract_name] = {
-                'strategies': strategies,
-                'raw_data': processed_data['raw_data'],
-                'summary_data': {
-                    'total_long': processed_data['total_long'],
-                    'total_short': processed_data['total_short'],
-                    'total_long_chg': processed_data['total_long_chg'],
-                    'total_short_chg': processed_data['total_short_chg']
-                }
+            for completed, future in enumerate(as_completed(future_to_name), 1):
+                contract_name = future_to_name[future]
+                if progress_callback:
+                    progress = 0.8 + (completed / total_contracts) * 0.1
+                    progress_callback(f"分析合约 {contract_name}...", progress)
+                
+                result = future.result()
+                if result:
+                    analyzed[contract_name] = result
+        
+        # 保持与输入一致的合约顺序
+        results = {name: analyzed[name] for name in position_data if name in analyzed}
+        if not results:
+            return results
+        
+        # 多空力量变化策略只依赖汇总数据，所有合约一次批量计算
+        totals_df = pd.DataFrame({
+            'contract': list(results),
+            'total_long_chg': [result['summary_data']['total_long_chg'] for result in results.values()],
+            'total_short_chg': [result['summary_data']['total_short_chg'] for result in results.values()]
+        })
+        power_change = self.strategy_analyzer.analyze_power_change_batch(totals_df)
+        
+        for contract_name, signal, reason, strength in zip(
+            power_change.index, power_change['signal'].tolist(), power_change['reason'], power_change['strength'].tolist()
+        ):
+            strategies = results[contract_name]['strategies']
+            results[contract_name]['strategies'] = {
+                '多空力量变化策略': {'signal': signal, 'reason': reason, 'strength': strength},
+                **strategies
             }
         
         return results
     
+    def _analyze_one(self, contract_name: str, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """
+        分析单个合约（在工作线程中执行）
+        :return: 合约分析结果，数据无效时返回None
+        """
+        # 处理数据
+        # 合约名称格式为"交易所_合约"
+        exchange_name = contract_name.split('_', 1)[0]
+        processed_data = self.strategy_analyzer.process_position_data(df, exchange_name)
+        if not processed_data:
+            return None
+        
+        # 应用各种策略（多空力量变化策略在全部合约分析完成后批量计算）
+        strategies = {}
+        
+        # 蜘蛛网策略
+        signal, reason, strength = self.strategy_analyzer.analyze_spider_web(processed_data)
+        strategies['蜘蛛网策略'] = {
+            'signal': signal,
+            'reason': reason,
+            'strength': strength
+        }
+        
+        # 家人席位反向操作策略
+        signal, reason, strength, seat_details = self.strategy_analyzer.analyze_retail_reverse(processed_data)
+        strategies['家人席位反向操作策略'] = {
+            'signal': signal,
+            'reason': reason,
+            'strength': strength,
+            'seat_details': seat_details
+        }
+        
+        return {
+            'strategies': strategies,
+            'raw_data': processed_data['raw_data'],
+            'summary_data': {
+                'total_long': processed_data['total_long'],
+                'total_short': processed_data['total_short'],
+                'total_long_chg': processed_data['total_long_chg'],
+                'total_short_chg': processed_data['total_short_chg']
+            }
+        }
+    
     def _generate_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """生成分析总结"""
         summary = {
@@ -649,13 +923,12 @@ class FuturesAnalysisEngine:
                             'reason': strategy_data['reason']
                         })
             
-            # 按强度排序
-            long_signals.sort(key=lambda x: x['strength'], reverse=True)
-            short_signals.sort(key=lambda x: x['strength'], reverse=True)
-            
+            # 只保留强度最高的前N个信号（展示和共振计算都只用到前N个），总数单独记录
             summary['strategy_signals'][strategy_name] = {
-                'long': long_signals,
-                'short': short_signals
+                'long': heapq.nlargest(TOP_SIGNALS, long_signals, key=lambda x: x['strength']),
+                'short': heapq.nlargest(TOP_SIGNALS, short_signals, key=lambda x: x['strength']),
+                'long_count': len(long_signals),
+                'short_count': len(short_signals)
             }
         
         # 计算信号共振
@@ -663,8 +936,8 @@ class FuturesAnalysisEngine:
         
         # 统计信息
         total_contracts = len(position_results)
-        total_long_signals = sum(len(signals['long']) for signals in summary['strategy_signals'].values())
-        total_short_signals = sum(len(signals['short']) for signals in summary['strategy_signals'].values())
+        total_long_signals = sum(signals['long_count'] for signals in summary['strategy_signals'].values())
+        total_short_signals = sum(signals['short_count'] for signals in summary['strategy_signals'].values())
         
         summary['statistics'] = {
             'total_contracts': total_contracts,
@@ -678,39 +951,25 @@ class FuturesAnalysisEngine:
     
     def _calculate_signal_resonance(self, strategy_signals: Dict[str, Any]) -> Dict[str, Any]:
         """计算信号共振"""
-        def extract_symbol(contract: str) -> str:
-            """提取品种代码"""
-            try:
-                if '_' in contract:
-                    symbol_part = contract.split('_')[-1]
-                else:
-                    symbol_part = contract
-                
-                symbol = ''.join(c for c in symbol_part if c.isalpha()).upper()
-                return symbol if symbol else contract
-            except:
-                return contract
+        def new_entry() -> Dict[str, Any]:
+            return {'count': 0, 'strategies': [], 'contracts': []}
         
-        long_symbol_count = {}
-        short_symbol_count = {}
+        long_symbol_count = defaultdict(new_entry)
+        short_symbol_count = defaultdict(new_entry)
         
         # 统计各品种在不同策略中的出现次数
         for strategy_name, signals in strategy_signals.items():
-            for signal in signals['long'][:10]:  # 只考虑前10个信号
-                symbol = extract_symbol(signal['contract'])
-                if symbol not in long_symbol_count:
-                    long_symbol_count[symbol] = {'count': 0, 'strategies': [], 'contracts': []}
-                long_symbol_count[symbol]['count'] += 1
-                long_symbol_count[symbol]['strategies'].append(strategy_name)
-                long_symbol_count[symbol]['contracts'].append(signal['contract'])
-            
-            for signal in signals['short'][:10]:
-                symbol = extract_symbol(signal['contract'])
-                if symbol not in short_symbol_count:
-                    short_symbol_count[symbol] = {'count': 0, 'strategies': [], 'contracts': []}
-                short_symbol_count[symbol]['count'] += 1
-                short_symbol_count[symbol]['strategies'].append(strategy_name)
-                short_symbol_count[symbol]['contracts'].append(signal['contract'])
+            for signal in signals['long'][:TOP_SIGNALS]:  # 只考虑前10个信号
+                entry = long_symbol_count[extract_symbol(signal['contract'])]
+                entry['count'] += 1
+                entry['strategies'].append(strategy_name)
+                entry['contracts'].append(signal['contract'])
+            
+            for signal in signals['short'][:TOP_SIGNALS]:
+                entry = short_symbol_count[extract_symbol(signal['contract'])]
+                entry['count'] += 1
+                entry['strategies'].append(strategy_name)
+                entry['contracts'].append(signal['contract'])
         
         # 筛选共振信号（出现在2个及以上策略中）
         resonance_long = {symbol: info for symbol, info in long_symbol_count.items() if info['count'] >= 2}
@@ -722,8 +981,9 @@ class FuturesAnalysisEngine:
         }
 
 # 工具函数
+@lru_cache(maxsize=256)
 def validate_trade_date(date_str: str) -> bool:
-    """验证交易日期格式"""
+    """验证交易日期格式（结果缓存，界面重跑时重复校验同一日期无需再次解析）"""
     try:
         datetime.strptime(date_str, '%Y%m%d')
         return True
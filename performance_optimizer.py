@@ -12,98 +12,301 @@ import pandas as pd
 import numpy as np
 import os
 import pickle
+import mmap
 import hashlib
+import glob
+import inspect
 import time
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Callable
 import concurrent.futures
-from functools import wraps
+from functools import wraps, lru_cache
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+import pyarrow as pa
+from pyarrow import feather
+from utils import save_sheets_parquet
+
+# 缓存文件写缓冲大小
+CACHE_WRITE_BUFFER = 1 << 20
+
+# 缓存文件扩展名：DataFrame使用Feather，其他数据使用pickle
+CACHE_EXTENSIONS = ('.pkl', '.feather')
+
+# 缓存目录总大小上限
+CACHE_SIZE_LIMIT = 512 * 1024 * 1024
+
+# 行情数据的价格/成交列，各市场返回的类型不一致（部分为字符串），合并前统一为float64
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'open_interest', 'turnover', 'settle', 'pre_settle')
+PRICE_EXCHANGE_NAMES = ["大商所", "中金所", "郑商所", "上期所"]
+
+# 缓存前压缩的数值列：成交量/持仓量转为最小的整数类型，价格转为float32（成交额数值大，保留float64）
+INTEGER_COLUMNS = frozenset({
+    'rank', 'vol', 'vol_chg',
+    'long_open_interest', 'long_open_interest_chg',
+    'short_open_interest', 'short_open_interest_chg',
+    'volume', 'open_interest',
+})
+FLOAT_COLUMNS = frozenset({'open', 'high', 'low', 'close', 'settle', 'pre_settle'})
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    压缩DataFrame数值列的类型，减小缓存文件体积和加载时间
+    :param df: 原始数据（不会被修改）
+    :return: 压缩后的DataFrame，没有可压缩的列时返回原对象
+    """
+    updates = {}
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col].dtype):
+            continue
+        if col in INTEGER_COLUMNS:
+            # 含空值的列无法转为整数，to_numeric会保持原类型
+            updates[col] = pd.to_numeric(df[col], downcast='integer')
+        elif col in FLOAT_COLUMNS:
+            updates[col] = pd.to_numeric(df[col], downcast='float')
+    return df.assign(**updates) if updates else df
+
+@st.cache_resource
+def get_optimized_session() -> requests.Session:
+    """
+    创建优化的HTTP会话
+    整个进程共用一个会话，Streamlit重新加载模块时也复用同一连接池，不会重复创建连接
+    """
+    session = requests.Session()
+    
+    # 配置重试策略
+    # 连接失败多重试几次；读取超时说明服务端已在处理，只重试一次
+    retry_strategy = Retry(
+        total=3,
+        connect=3,
+        read=1,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    
+    # 连接池按并发线程数放大，连接保持keep-alive复用，避免每次请求重新握手
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=50,
+        pool_block=False,
+        max_retries=retry_strategy
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    # 设置超时
+    session.timeout = 30
+    
+    return session
 
 class PerformanceOptimizer:
     """性能优化器"""
     
     def __init__(self, cache_dir: str = "cache"):
         self.cache_dir = cache_dir
+        self.size_limit = CACHE_SIZE_LIMIT
+        self._index = None  # 缓存键 -> 缓存文件路径
+        self._index_lock = threading.Lock()
         self.ensure_cache_directory()
-        self.session = self.create_optimized_session()
+        self.session = get_optimized_session()
         
     def ensure_cache_directory(self):
         """确保缓存目录存在"""
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
     
-    def create_optimized_session(self):
-        """创建优化的HTTP会话"""
-        session = requests.Session()
-        
-        # 配置重试策略
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+    def get_cache_key(self, func_name: str, *args, **kwargs) -> str:
+        """
+        生成缓存键
+        函数名和参数作为一个元组按二进制序列化后计算BLAKE2b摘要，序列化结果包含类型信息，
+        1、'1'、1.0等参数不会得到相同的键；参数不可序列化时退回使用repr
+        回调函数等可调用参数不影响结果，也无法稳定序列化，不参与计算
+        """
+        key_args = (
+            func_name,
+            tuple(arg for arg in args if not callable(arg)),
+            tuple(sorted((k, v) for k, v in kwargs.items() if not callable(v))),
         )
-        
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        # 设置超时
-        session.timeout = 30
-        
-        return session
+        try:
+            key_bytes = pickle.dumps(key_args, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            key_bytes = repr(key_args).encode()
+        return hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
     
-    def get_cache_key(self, func_name: str, *args, **kwargs) -> str:
-        """生成缓存键"""
-        key_data = f"{func_name}_{str(args)}_{str(sorted(kwargs.items()))}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+    def get_cache_path(self, cache_key: str, expiry: int, extension: str = ".pkl") -> str:
+        """获取缓存文件路径，文件名中包含过期时间戳：{缓存键}_{过期时间}{扩展名}"""
+        return os.path.join(self.cache_dir, f"{cache_key}_{expiry}{extension}")
     
-    def get_cache_path(self, cache_key: str) -> str:
-        """获取缓存文件路径"""
-        return os.path.join(self.cache_dir, f"{cache_key}.pkl")
+    @staticmethod
+    def parse_expiry(cache_path: str) -> Optional[int]:
+        """从缓存文件名中解析过期时间戳，不是该格式的文件返回None"""
+        stem = os.path.basename(cache_path).rsplit('.', 1)[0]
+        _, sep, expiry = stem.rpartition('_')
+        return int(expiry) if sep and expiry.isdigit() else None
     
-    def is_cache_valid(self, cache_path: str, max_age_hours: int = 24) -> bool:
-        """检查缓存是否有效"""
-        if not os.path.exists(cache_path):
-            return False
+    def is_cache_valid(self, cache_path: str) -> bool:
+        """检查缓存是否有效（只比较文件名中的过期时间，无需访问文件系统）"""
+        expiry = self.parse_expiry(cache_path)
+        return expiry is not None and time.time() < expiry
+    
+    def _get_index(self) -> Dict[str, str]:
+        """
+        缓存键到缓存文件路径的索引
+        首次使用时扫描一次缓存目录，之后随本实例的保存和清理同步更新；
+        其他实例或进程写入的文件不在索引中，查找未命中时由_find_cache_file补充
+        """
+        with self._index_lock:
+            if self._index is None:
+                index = {}
+                with os.scandir(self.cache_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(CACHE_EXTENSIONS) and self.parse_expiry(entry.name) is not None:
+                            cache_key = entry.name.rsplit('.', 1)[0].rpartition('_')[0]
+                            # 同一缓存键存在多个文件时使用过期时间最晚的
+                            if cache_key not in index or self.parse_expiry(index[cache_key]) < self.parse_expiry(entry.name):
+                                index[cache_key] = entry.path
+                self._index = index
+            return self._index
+    
+    def _find_cache_file(self, cache_key: str) -> Optional[str]:
+        """
+        在缓存目录中查找缓存键对应的最新文件（glob {缓存键}_*），找到后加入索引
+        用于索引未命中或索引中的文件已过期时，读取其他实例或进程写入的缓存
+        """
+        pattern = os.path.join(glob.escape(self.cache_dir), f"{glob.escape(cache_key)}_*")
+        best_path, best_expiry = None, None
+        for path in glob.glob(pattern):
+            if not path.endswith(CACHE_EXTENSIONS):
+                continue
+            name = os.path.basename(path)
+            expiry = self.parse_expiry(name)
+            # 排除前缀相同的其他缓存键（如键"a"匹配到"a_b_<过期时间>"）
+            if expiry is None or name.rsplit('.', 1)[0].rpartition('_')[0] != cache_key:
+                continue
+            if best_expiry is None or expiry > best_expiry:
+                best_path, best_expiry = path, expiry
         
-        file_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
-        return datetime.now() - file_time < timedelta(hours=max_age_hours)
+        if best_path is not None:
+            index = self._get_index()
+            with self._index_lock:
+                index[cache_key] = best_path
+        return best_path
+    
+    def _update_index(self, cache_key: str, cache_path: Optional[str]):
+        """更新缓存索引，并删除该缓存键被替换掉的旧文件"""
+        index = self._get_index()
+        with self._index_lock:
+            old_path = index.pop(cache_key, None)
+            if cache_path is not None:
+                index[cache_key] = cache_path
+        if old_path and old_path != cache_path:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
     
-    def save_to_cache(self, cache_key: str, data: Any):
-        """保存数据到缓存"""
+    def save_to_cache(self, cache_key: str, data: Any, max_age_hours: float = 24):
+        """
+        保存数据到缓存
+        DataFrame保存为Feather列式文件（lz4压缩，读取时可内存映射），其他数据使用pickle
+        """
         try:
-            cache_path = self.get_cache_path(cache_key)
-            with open(cache_path, 'wb') as f:
-                pickle.dump(data, f)
+            expiry = int(time.time() + max_age_hours * 3600)
+            cache_path = None
+            if isinstance(data, pd.DataFrame):
+                cache_path = self._save_feather(cache_key, expiry, data)
+            
+            if cache_path is None:
+                cache_path = self.get_cache_path(cache_key, expiry)
+                # 使用最高协议版本（numpy/pandas数据序列化更快、体积更小），
+                # 1MB写缓冲减少系统调用；先写临时文件再替换，避免读到写了一半的缓存
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb', buffering=CACHE_WRITE_BUFFER) as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            
+            self._update_index(cache_key, cache_path)
         except Exception as e:
             st.warning(f"缓存保存失败: {str(e)}")
     
+    def _save_feather(self, cache_key: str, expiry: int, df: pd.DataFrame) -> Optional[str]:
+        """以Feather格式保存DataFrame并返回文件路径，列名等不受支持时返回None，由调用方改用pickle"""
+        cache_path = self.get_cache_path(cache_key, expiry, ".feather")
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            feather.write_feather(df, tmp_path, compression='lz4')
+        except (ValueError, TypeError, pa.ArrowException):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        os.replace(tmp_path, cache_path)
+        return cache_path
+    
     def load_from_cache(self, cache_key: str) -> Optional[Any]:
         """从缓存加载数据"""
+        cache_path = self._get_index().get(cache_key)
+        if cache_path is None or not self.is_cache_valid(cache_path):
+            # 索引未命中时到目录中查找一次，其他实例或进程可能已写入该缓存
+            cache_path = self._find_cache_file(cache_key)
+            if cache_path is None or not self.is_cache_valid(cache_path):
+                return None
+        
         try:
-            cache_path = self.get_cache_path(cache_key)
-            if self.is_cache_valid(cache_path):
-                with open(cache_path, 'rb') as f:
-                    return pickle.load(f)
+            if cache_path.endswith('.feather'):
+                return feather.read_feather(cache_path, memory_map=True)
+            with open(cache_path, 'rb') as f:
+                # 内存映射读取：由操作系统按需换页，不必先把整个文件读入堆内存再反序列化
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return pickle.loads(mm)
+        except FileNotFoundError:
+            # 文件已被外部删除，同步索引
+            self._update_index(cache_key, None)
         except Exception as e:
             st.warning(f"缓存加载失败: {str(e)}")
         return None
     
     def clear_old_cache(self, max_age_days: int = 7):
-        """清理旧缓存"""
+        """
+        清理旧缓存
+        先删除已过期或超过保留天数的文件，剩余文件总大小超过上限时再从最早写入的开始删除
+        """
         try:
-            cutoff_time = datetime.now() - timedelta(days=max_age_days)
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.pkl'):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    if file_time < cutoff_time:
-                        os.remove(file_path)
+            now = time.time()
+            cutoff_time = (datetime.now() - timedelta(days=max_age_days)).timestamp()
+            remaining = []
+            # scandir的目录项自带文件信息，一次stat即可取得修改时间和大小
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(CACHE_EXTENSIONS):
+                        continue
+                    # 文件可能在列目录后被其他线程删除或替换，跳过该文件继续清理
+                    try:
+                        expiry = self.parse_expiry(entry.name)
+                        stat = entry.stat()
+                        if (expiry is not None and expiry <= now) or stat.st_mtime < cutoff_time:
+                            os.remove(entry.path)
+                        else:
+                            remaining.append((stat.st_mtime, stat.st_size, entry.path))
+                    except FileNotFoundError:
+                        continue
+            
+            total_size = sum(size for _, size, _ in remaining)
+            for _, size, file_path in sorted(remaining):
+                if total_size <= self.size_limit:
+                    break
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
         except Exception as e:
             st.warning(f"缓存清理失败: {str(e)}")
+        finally:
+            # 文件已变化，下次查找时重新扫描
+            with self._index_lock:
+                self._index = None
 
 # 全局优化器实例
 optimizer = PerformanceOptimizer()
@@ -111,10 +314,14 @@ optimizer = PerformanceOptimizer()
 def smart_cache(max_age_hours: int = 24):
     """智能缓存装饰器"""
     def decorator(func):
+        # 装饰的是方法时，实例本身不参与缓存键（其repr含内存地址，每次启动都不同）
+        is_method = next(iter(inspect.signature(func).parameters), None) == 'self'
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # 生成缓存键
-            cache_key = optimizer.get_cache_key(func.__name__, *args, **kwargs)
+            key_args = args[1:] if is_method else args
+            cache_key = optimizer.get_cache_key(func.__qualname__, *key_args, **kwargs)
             
             # 尝试从缓存加载
             cached_data = optimizer.load_from_cache(cache_key)
@@ -126,37 +333,114 @@ def smart_cache(max_age_hours: int = 24):
             st.info(f"🔄 正在获取新数据 - {func.__name__}")
             result = func(*args, **kwargs)
             
-            # 保存到缓存
-            if result is not None:
-                optimizer.save_to_cache(cache_key, result)
+            # 保存到缓存：空结果（全部获取失败或数据尚未发布）不缓存，下次调用重新获取
+            if not _is_empty_result(result):
+                optimizer.save_to_cache(cache_key, result, max_age_hours=max_age_hours)
             
             return result
         return wrapper
     return decorator
 
-@st.cache_data(ttl=3600)  # Streamlit缓存1小时
-def cached_data_fetch(func_name: str, date: str, exchange: str = None):
-    """缓存的数据获取函数"""
+# 支持的akshare数据接口
+FETCH_FUNCTIONS = (
+    "futures_dce_position_rank",
+    "get_cffex_rank_table",
+    "get_czce_rank_table",
+    "get_shfe_rank_table",
+    "futures_gfex_position_rank",
+    "get_futures_daily",
+)
+
+# 广期所获取失败后的跳过时间（分钟）及其缓存键
+GFEX_FUNC_NAME = "futures_gfex_position_rank"
+GFEX_FAILED_KEY = "_gfex_failed"
+GFEX_RETRY_MINUTES = 5
+
+# 单次数据获取的默认等待时间（秒）
+FETCH_TIMEOUT = 30
+
+def call_with_timeout(func, timeout: float, *args, **kwargs):
+    """
+    在独立线程中执行调用并限制等待时间，超时抛出TimeoutError
+    akshare接口不支持timeout参数；超时后不再等待，后台调用自行结束
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        return executor.submit(func, *args, **kwargs).result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        raise TimeoutError(f"数据获取超时（{timeout}秒）")
+    finally:
+        executor.shutdown(wait=False)
+
+@lru_cache(maxsize=1)
+def _get_dispatch() -> Dict[str, Callable]:
+    """接口名到akshare函数的映射，首次使用时导入akshare并绑定一次"""
     import akshare as ak
+    return {name: getattr(ak, name) for name in FETCH_FUNCTIONS}
+
+# 进程内数据缓存：有效期（秒）和最大条目数，与原Streamlit缓存的1小时有效期一致
+FETCH_CACHE_TTL = 3600
+FETCH_CACHE_MAX_ENTRIES = 32
+_fetch_cache = {}  # (接口名, 日期, 市场) -> (数据, 获取时间)
+_fetch_cache_lock = threading.Lock()
+
+def _is_empty_result(result) -> bool:
+    """判断获取结果是否为空（None、空字典、空DataFrame）"""
+    if result is None:
+        return True
+    if isinstance(result, pd.DataFrame):
+        return result.empty
+    return isinstance(result, dict) and not result
+
+def _do_fetch(func_name: str, date: str, exchange: str = None):
+    """
+    调用akshare获取数据（进程内缓存FETCH_CACHE_TTL秒，同一会话重跑时直接返回）
+    获取失败时抛出异常；失败和空结果都不会被缓存（如当日数据尚未发布），下次调用重新获取
+    """
+    key = (func_name, date, exchange)
+    with _fetch_cache_lock:
+        cached = _fetch_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < FETCH_CACHE_TTL:
+        return cached[0]
     
-    try:
-        if func_name == "futures_dce_position_rank":
-            return ak.futures_dce_position_rank(date=date)
-        elif func_name == "get_cffex_rank_table":
-            return ak.get_cffex_rank_table(date=date)
-        elif func_name == "get_czce_rank_table":
-            return ak.get_czce_rank_table(date=date)
-        elif func_name == "get_shfe_rank_table":
-            return ak.get_shfe_rank_table(date=date)
-        elif func_name == "futures_gfex_position_rank":
-            return ak.futures_gfex_position_rank(date=date)
-        elif func_name == "get_futures_daily" and exchange:
-            return ak.get_futures_daily(start_date=date, end_date=date, market=exchange)
-        else:
-            return None
-    except Exception as e:
-        st.error(f"数据获取失败 {func_name}: {str(e)}")
+    fn = _get_dispatch().get(func_name)
+    if fn is None:
         return None
+    
+    if func_name == "get_futures_daily":
+        result = fn(start_date=date, end_date=date, market=exchange) if exchange else None
+    else:
+        result = fn(date=date)
+    
+    if not _is_empty_result(result):
+        now = time.monotonic()
+        with _fetch_cache_lock:
+            # 先清除过期条目，条目数仍超过上限时删除最早写入的
+            for expired in [k for k, (_, fetched_at) in _fetch_cache.items() if now - fetched_at >= FETCH_CACHE_TTL]:
+                del _fetch_cache[expired]
+            _fetch_cache.pop(key, None)
+            while len(_fetch_cache) >= FETCH_CACHE_MAX_ENTRIES:
+                del _fetch_cache[next(iter(_fetch_cache))]
+            _fetch_cache[key] = (result, now)
+    return result
+
+def cached_data_fetch(func_name: str, date: str, exchange: str = None, timeout: float = FETCH_TIMEOUT):
+    """
+    缓存的数据获取函数
+    进程内缓存由_do_fetch提供，行情结果另有smart_cache磁盘缓存，不再叠加Streamlit缓存，
+    避免同一结果被序列化两次
+    通常在工作线程中调用，获取失败或超过timeout秒时抛出异常，由调用方汇总后在主线程中提示
+    """
+    # 广期所接口经常不可用，失败后的一段时间内直接跳过，避免每次页面重跑都等待超时
+    if func_name == GFEX_FUNC_NAME and optimizer.load_from_cache(GFEX_FAILED_KEY):
+        raise RuntimeError(f"广期所接口暂不可用，{GFEX_RETRY_MINUTES}分钟内不再重试")
+    
+    try:
+        return call_with_timeout(_do_fetch, timeout, func_name, date, exchange)
+    except Exception:
+        if func_name == GFEX_FUNC_NAME:
+            optimizer.save_to_cache(GFEX_FAILED_KEY, True, max_age_hours=GFEX_RETRY_MINUTES / 60)
+        raise
 
 class FastDataManager:
     """快速数据管理器"""
@@ -202,10 +486,11 @@ class FastDataManager:
     def fetch_position_data_fast(self, trade_date: str, progress_callback=None) -> bool:
         """快速获取持仓数据 - 使用并发和缓存"""
         success_count = 0
+        failures = []
         total_exchanges = len(self.exchange_config)
         
-        # 使用线程池并发获取数据
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        # 使用线程池并发获取数据，每个交易所一个线程（各自访问不同站点，互不争用）
+        with concurrent.futures.ThreadPoolExecutor(max_workers=total_exchanges) as executor:
             future_to_exchange = {}
             
             for exchange_name, config in self.exchange_config.items():
@@ -224,39 +509,45 @@ class FastDataManager:
                     progress_callback(f"已完成 {exchange_name} 数据获取", progress)
                 
                 try:
-                    success = future.result(timeout=60)  # 60秒超时
-                    if success:
-                        success_count += 1
+                    # as_completed返回的任务已经结束；等待时间由工作线程内的call_with_timeout限制
+                    success, message = future.result()
                 except Exception as e:
-                    st.warning(f"{exchange_name} 数据获取失败: {str(e)}")
-                    continue
+                    success, message = False, f"{exchange_name} 数据获取失败: {str(e)}"
+                
+                if success:
+                    success_count += 1
+                else:
+                    failures.append(message)
+        
+        # Streamlit界面只在主线程中更新，失败信息汇总后统一提示
+        if failures:
+            st.warning("\n\n".join(failures))
         
         if progress_callback:
             progress_callback("持仓数据获取完成", 0.6)
         
         return success_count > 0
     
-    def _fetch_single_exchange_data(self, exchange_name: str, config: dict, trade_date: str) -> bool:
-        """获取单个交易所数据"""
+    def _fetch_single_exchange_data(self, exchange_name: str, config: dict, trade_date: str) -> Tuple[bool, str]:
+        """
+        获取单个交易所数据（在工作线程中运行，不调用Streamlit界面函数）
+        :return: (是否成功, 结果说明)
+        """
         try:
             # 使用缓存的数据获取函数
-            data_dict = cached_data_fetch(config["func_name"], trade_date)
+            data_dict = cached_data_fetch(config["func_name"], trade_date, timeout=config["timeout"])
             
-            if data_dict:
-                # 保存到Excel
-                save_path = os.path.join(self.data_dir, config['filename'])
-                with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
-                    for sheet_name, df in data_dict.items():
-                        # 清理sheet名称
-                        clean_name = sheet_name[:31].replace("/", "-").replace("*", "")
-                        df.to_excel(writer, sheet_name=clean_name, index=False)
-                
-                return True
+            if not data_dict:
+                return False, f"{exchange_name} 未返回数据"
             
-        except Exception as e:
-            st.warning(f"获取{exchange_name}数据失败: {str(e)}")
+            # 保存为Parquet（每个交易所一个子目录），与分析引擎的加载格式一致
+            data_dict = {name: _downcast(df) for name, df in data_dict.items()}
+            if save_sheets_parquet(data_dict, os.path.join(self.data_dir, exchange_name)):
+                return True, f"{exchange_name} 数据获取成功"
+            return False, f"{exchange_name} 数据保存失败"
             
-        return False
+        except Exception as e:
+            return False, f"获取{exchange_name}数据失败: {str(e)}"
     
     @smart_cache(max_age_hours=6)
     def fetch_price_data_fast(self, trade_date: str, progress_callback=None) -> pd.DataFrame:
@@ -269,9 +560,10 @@ class FastDataManager:
         ]
         
         all_data = []
+        failures = []
         
-        # 并发获取行情数据
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        # 并发获取行情数据，四个市场同时请求
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(price_exchanges)) as executor:
             future_to_exchange = {}
             
             for exchange in price_exchanges:
@@ -291,23 +583,33 @@ class FastDataManager:
                     progress_callback(f"已完成 {exchange['name']} 行情数据", progress)
                 
                 try:
-                    df = future.result(timeout=30)
+                    df = future.result()
                     if df is not None and not df.empty:
-                        df['exchange'] = exchange["name"]
-                        all_data.append(df)
+                        # 返回的数据可能是进程内缓存的共享对象，不在原对象上修改；
+                        # 各市场列类型一致后concat可直接按块拼接，无需再推断和转换类型
+                        columns = {
+                            col: pd.to_numeric(df[col], errors='coerce').astype(np.float64, copy=False)
+                            for col in PRICE_COLUMNS if col in df.columns
+                        }
+                        columns['exchange'] = pd.Categorical([exchange["name"]] * len(df), categories=PRICE_EXCHANGE_NAMES)
+                        all_data.append(df.assign(**columns))
                 except Exception as e:
-                    st.warning(f"获取{exchange['name']}行情数据失败: {str(e)}")
-                    continue
+                    failures.append(f"获取{exchange['name']}行情数据失败: {str(e)}")
+        
+        if failures:
+            st.warning("\n\n".join(failures))
         
         if progress_callback:
             progress_callback("行情数据获取完成", 0.8)
         
-        return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+        return _downcast(pd.concat(all_data, ignore_index=True, copy=False)) if all_data else pd.DataFrame()
 
 def optimize_streamlit_performance():
     """优化Streamlit性能"""
-    # 清理旧缓存
-    optimizer.clear_old_cache()
+    # 在后台线程中清理旧缓存，不阻塞页面首次渲染；每个会话只清理一次
+    if not st.session_state.get('cleanup_started', False):
+        st.session_state.cleanup_started = True
+        threading.Thread(target=optimizer.clear_old_cache, daemon=True).start()
     
     # 设置Streamlit配置
     if 'performance_optimized' not in st.session_state:
@@ -326,8 +628,16 @@ def optimize_streamlit_performance():
 
 def show_performance_metrics():
     """显示性能指标"""
-    cache_files = [f for f in os.listdir(optimizer.cache_dir) if f.endswith('.pkl')]
-    cache_size = len(cache_files)
+    cache_mtimes = []
+    with os.scandir(optimizer.cache_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(CACHE_EXTENSIONS):
+                # 后台清理线程可能在列目录后删除文件
+                try:
+                    cache_mtimes.append(entry.stat().st_mtime)
+                except FileNotFoundError:
+                    continue
+    cache_size = len(cache_mtimes)
     
     col1, col2, col3 = st.columns(3)
     
@@ -336,11 +646,7 @@ def show_performance_metrics():
     
     with col2:
         if cache_size > 0:
-            latest_cache = max(
-                [os.path.join(optimizer.cache_dir, f) for f in cache_files],
-                key=os.path.getmtime
-            )
-            cache_time = datetime.fromtimestamp(os.path.getmtime(latest_cache))
+            cache_time = datetime.fromtimestamp(max(cache_mtimes))
             st.metric("最新缓存", cache_time.strftime("%H:%M"))
         else:
             st.metric("最新缓存", "无")
@@ -30,7 +30,7 @@ except ImportError:
 
 # 导入云端数据获取器
 try:
-    from cloud_data_fetcher import cloud_fetcher
+    from cloud_data_fetcher import get_cloud_fetcher
     CLOUD_FETCHER_AVAILABLE = True
 except ImportError:
     CLOUD_FETCHER_AVAILABLE = False
@@ -185,7 +185,7 @@ class StreamlitApp:
             with col2:
                 if st.button("🔍 网络诊断"):
                     if CLOUD_FETCHER_AVAILABLE:
-                        cloud_fetcher.diagnose_network_issues()
+                        get_cloud_fetcher().diagnose_network_issues()
                     else:
                         st.warning("云端诊断功能不可用")
             
@@ -338,7 +338,7 @@ class StreamlitApp:
             if st.session_state.demo_mode:
                 st.info("🎭 演示模式：正在创建模拟数据...")
                 if CLOUD_FETCHER_AVAILABLE:
-                    cloud_fetcher.create_demo_data(trade_date_str)
+                    get_cloud_fetcher().create_demo_data(trade_date_str)
                 else:
                     st.error("演示模式不可用，请启用云端数据获取器")
                     return
@@ -351,7 +351,7 @@ class StreamlitApp:
                     progress_callback("正在使用云端优化获取数据...", 0.1)
                     
                     # 获取持仓数据
-                    position_success = cloud_fetcher.fetch_position_data_with_fallback(
+                    position_success = get_cloud_fetcher().fetch_position_data_with_fallback(
                         trade_date_str, progress_callback
                     )
                     
@@ -361,12 +361,12 @@ class StreamlitApp:
                         # 询问是否使用演示数据
                         if st.button("🎭 使用演示数据继续体验"):
                             st.session_state.demo_mode = True
-                            cloud_fetcher.create_demo_data(trade_date_str)
+                            get_cloud_fetcher().create_demo_data(trade_date_str)
                             st.rerun()
                         return
                     
                     # 获取行情数据
-                    price_data = cloud_fetcher.fetch_price_data_with_fallback(
+                    price_data = get_cloud_fetcher().fetch_price_data_with_fallback(
                         trade_date_str, progress_callback
                     )
                 
@@ -1079,9 +1079,9 @@ class StreamlitApp:
         st.markdown("---")
         st.markdown(f"""
         ### 📊 {strategy_type}策略统计
-        - 看多信号数量: {len(signals['long'])}
-        - 看空信号数量: {len(signals['short'])}
-        - 总信号数量: {len(signals['long']) + len(signals['short'])}
+        - 看多信号数量: {signals.get('long_count', len(signals['long']))}
+        - 看空信号数量: {signals.get('short_count', len(signals['short']))}
+        - 总信号数量: {signals.get('long_count', len(signals['long'])) + signals.get('short_count', len(signals['short']))}
         """)
         
         # 信号强度图表
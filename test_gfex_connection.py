@@ -9,12 +9,23 @@
 
 import akshare as ak
 import time
-import signal
 import sys
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 
-def timeout_handler(signum, frame):
-    raise TimeoutError("数据获取超时")
+def call_with_timeout(func, timeout: float, *args, **kwargs):
+    """
+    在独立线程中执行调用并限制等待时间，超时抛出TimeoutError
+    不依赖SIGALRM信号，Windows下同样有效
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        return executor.submit(func, *args, **kwargs).result(timeout=timeout)
+    except FutureTimeoutError:
+        raise TimeoutError("数据获取超时")
+    finally:
+        # 超时后不等待后台调用结束
+        executor.shutdown(wait=False)
 
 def test_gfex_connection(trade_date: str = None):
     """测试广期所数据连接"""
@@ -72,21 +83,12 @@ def test_gfex_connection(trade_date: str = None):
     # 测试4: 带超时的数据获取测试
     print("\n⏰ 测试4: 带超时的数据获取测试（15秒）")
     
-    # 设置超时信号（仅在非Windows系统）
-    if hasattr(signal, 'SIGALRM'):
-        signal.signal(signal.SIGALRM, timeout_handler)
-        signal.alarm(15)
-    
     try:
         start_time = time.time()
         print("正在获取广期所数据（15秒超时）...")
-        data = ak.futures_gfex_position_rank(date=trade_date)
+        data = call_with_timeout(ak.futures_gfex_position_rank, 15, date=trade_date)
         elapsed_time = time.time() - start_time
         
-        # 取消超时信号
-        if hasattr(signal, 'SIGALRM'):
-            signal.alarm(0)
-        
         if data:
             print(f"✅ 数据获取成功！耗时: {elapsed_time:.2f} 秒")
             print(f"📊 获取到 {len(data)} 个品种的数据")
@@ -100,10 +102,6 @@ def test_gfex_connection(trade_date: str = None):
         elapsed_time = time.time() - start_time
         print(f"❌ 数据获取失败，耗时: {elapsed_time:.2f} 秒")
         print(f"错误信息: {str(e)}")
-    finally:
-        # 确保清理超时信号
-        if hasattr(signal, 'SIGALRM'):
-            signal.alarm(0)
     
     # 测试5: 重试机制测试
     print("\n🔄 测试5: 重试机制测试")
@@ -114,17 +112,9 @@ def test_gfex_connection(trade_date: str = None):
             start_time = time.time()
             
             # 设置较短超时
-            if hasattr(signal, 'SIGALRM'):
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(10)
-            
-            data = ak.futures_gfex_position_rank(date=trade_date)
+            data = call_with_timeout(ak.futures_gfex_position_rank, 10, date=trade_date)
             elapsed_time = time.time() - start_time
             
-            # 取消超时信号
-            if hasattr(signal, 'SIGALRM'):
-                signal.alarm(0)
-            
             if data:
                 print(f"✅ 第 {attempt + 1} 次尝试成功！耗时: {elapsed_time:.2f} 秒")
                 break
@@ -139,10 +129,6 @@ def test_gfex_connection(trade_date: str = None):
             if attempt < max_retries - 1:
                 print("等待2秒后重试...")
                 time.sleep(2)
-        finally:
-            # 确保清理超时信号
-            if hasattr(signal, 'SIGALRM'):
-                signal.alarm(0)
     
     print("\n" + "=" * 50)
     print("🎯 测试总结:")
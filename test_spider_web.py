@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+蜘蛛网策略MSD计算测试
+验证pandas写时复制模式下（to_numpy返回只读数组）numba编译的计算函数仍能正常调用
+运行方式：python -m unittest test_spider_web
+"""
+
+import contextlib
+import unittest
+
+import numpy as np
+import pandas as pd
+
+try:
+    import futures_analyzer
+except ImportError:  # akshare等依赖未安装时跳过
+    futures_analyzer = None
+
+
+def copy_on_write():
+    """开启pandas写时复制模式（pandas 3起为默认行为，不再提供该选项）"""
+    try:
+        return pd.option_context('mode.copy_on_write', True)
+    except (KeyError, ValueError, pd.errors.OptionError):
+        return contextlib.nullcontext()
+
+
+def make_position_frame() -> pd.DataFrame:
+    """构造一份有效席位充足的持仓排名数据"""
+    return pd.DataFrame({
+        'vol': [5000.0, 4200.0, 3900.0, 3100.0, 2500.0, 1800.0, 1200.0, 900.0],
+        'long_open_interest': [3000.0, 2800.0, 1000.0, 900.0, 700.0, 650.0, 400.0, 300.0],
+        'short_open_interest': [800.0, 1100.0, 1500.0, 1200.0, 900.0, 500.0, 450.0, 350.0],
+    })
+
+
+@unittest.skipIf(futures_analyzer is None, "futures_analyzer依赖未安装")
+class SpiderWebCopyOnWriteTest(unittest.TestCase):
+    """写时复制模式下的蜘蛛网策略测试"""
+
+    def test_msd_accepts_readonly_arrays(self):
+        with copy_on_write():
+            df = make_position_frame()
+            arrays = [df[col].to_numpy(dtype=np.float64)
+                      for col in ('long_open_interest', 'short_open_interest', 'vol')]
+            msd = futures_analyzer._msd(*arrays)
+
+        # 与未编译的实现结果一致
+        py_msd = getattr(futures_analyzer._msd, 'py_func', futures_analyzer._msd)
+        expected = py_msd(*[np.array(arr) for arr in arrays])
+        self.assertAlmostEqual(msd, expected)
+
+    def test_msd_accepts_writable_arrays(self):
+        df = make_position_frame()
+        msd = futures_analyzer._msd(
+            np.array(df['long_open_interest'], dtype=np.float64),
+            np.array(df['short_open_interest'], dtype=np.float64),
+            np.array(df['vol'], dtype=np.float64),
+        )
+        self.assertFalse(np.isnan(msd))
+
+    def test_spider_web_on_copy_on_write_frame(self):
+        analyzer = futures_analyzer.StrategyAnalyzer(retail_seats=[])
+        with copy_on_write():
+            signal, reason, _ = analyzer.analyze_spider_web({'raw_data': make_position_frame()})
+        self.assertNotEqual(signal, "错误", reason)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工具函数测试
+验证重复表头的数据表（郑商所格式）可以保存为Parquet并按原Excel流程的列名读回
+运行方式：python -m unittest test_utils
+"""
+
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils import dedupe_columns, save_sheets_parquet, load_sheets_parquet
+
+
+def make_czce_frame() -> pd.DataFrame:
+    """构造郑商所格式的持仓数据：多空两侧使用相同的表头"""
+    df = pd.DataFrame([
+        ['期货公司1', 1200, 30, '期货公司2', 900, -15],
+        ['期货公司3', 800, -10, '期货公司4', 700, 20],
+    ])
+    df.columns = ['g_party_n', 'open_inten', 'inten_intert', 't_party_n', 'open_inten', 'inten_intert']
+    return df
+
+
+class DedupeColumnsTest(unittest.TestCase):
+    """表头去重测试"""
+
+    def test_matches_read_excel_naming(self):
+        self.assertEqual(
+            dedupe_columns(['a', 'b', 'a', None, 'a', '']),
+            ['a', 'b', 'a.1', 'Unnamed: 3', 'a.2', 'Unnamed: 5'],
+        )
+
+
+class SaveSheetsParquetTest(unittest.TestCase):
+    """Parquet保存测试"""
+
+    def test_duplicate_headers_are_renamed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertTrue(save_sheets_parquet({'CF501': make_czce_frame()}, directory))
+            loaded = load_sheets_parquet(directory)
+
+        self.assertEqual(
+            list(loaded['CF501'].columns),
+            ['g_party_n', 'open_inten', 'inten_intert', 't_party_n', 'open_inten.1', 'inten_intert.1'],
+        )
+        self.assertEqual(loaded['CF501']['open_inten.1'].tolist(), [900, 700])
+
+
+if __name__ == "__main__":
+    unittest.main()
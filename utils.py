@@ -234,13 +234,24 @@ def merge_dataframes(dfs: List[pd.DataFrame], on: str = None) -> pd.DataFrame:
         logging.error(f"合并DataFrame失败: {str(e)}")
         return pd.DataFrame()
 
+# Excel不允许出现在sheet名称中的字符，一次translate完成全部替换
+_SHEET_NAME_TABLE = str.maketrans({
+    "/": "-", "\\": "-", ":": "-",
+    "*": "", "?": "",
+    "[": "(", "]": ")",
+})
+
+def clean_sheet_name(sheet_name: str, max_length: int = 31) -> str:
+    """清理sheet名称中的非法字符并截断到Excel允许的长度"""
+    return sheet_name.translate(_SHEET_NAME_TABLE)[:max_length]
+
 def export_to_excel(data: Dict[str, pd.DataFrame], filename: str) -> bool:
     """导出数据到Excel"""
     try:
         with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
             for sheet_name, df in data.items():
                 # 清理sheet名称
-                clean_name = sheet_name[:31].replace("/", "-").replace("*", "")
+                clean_name = clean_sheet_name(sheet_name)
                 df.to_excel(writer, sheet_name=clean_name, index=False)
         return True
     except Exception as e:
@@ -255,6 +266,76 @@ def load_from_excel(filename: str) -> Dict[str, pd.DataFrame]:
         logging.error(f"加载Excel失败: {str(e)}")
         return {}
 
+def dedupe_columns(columns) -> List:
+    """
+    按pd.read_excel的规则处理表头：空表头记为"Unnamed: i"，重复列名依次加".1"、".2"后缀
+    （郑商所数据依赖open_inten.1等列名区分多空，Parquet也不允许重复列名）
+    :param columns: 原始列名
+    :return: 处理后的列名列表
+    """
+    result = []
+    seen = {}
+    for i, name in enumerate(columns):
+        name = f"Unnamed: {i}" if name is None or name == '' else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        result.append(name)
+    return result
+
+def save_sheets_parquet(data: Dict[str, pd.DataFrame], directory: str) -> bool:
+    """
+    保存多个数据表为Parquet文件（每个数据表一个文件，zstd压缩）
+    写入速度和读取速度都远快于Excel，作为程序内部的数据缓存格式
+    :param data: {数据表名称: DataFrame}
+    :param directory: 保存目录，目录中旧的Parquet文件会被清除
+    :return: 是否成功
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+        
+        # 清除旧文件，避免残留上一次的合约
+        for filename in os.listdir(directory):
+            if filename.endswith('.parquet'):
+                os.remove(os.path.join(directory, filename))
+        
+        for sheet_name, df in data.items():
+            # 清理文件名
+            clean_name = sheet_name.translate(_SHEET_NAME_TABLE)
+            # 重复列名无法写入Parquet，与原Excel读写流程一样加后缀区分
+            if df.columns.has_duplicates:
+                df = df.set_axis(dedupe_columns(df.columns), axis=1)
+            # 混合类型的object列无法写入Parquet，统一转为字符串类型
+            object_columns = df.columns[df.dtypes == object]
+            if len(object_columns) > 0:
+                df = df.astype({col: 'string' for col in object_columns})
+            df.to_parquet(
+                os.path.join(directory, f"{clean_name}.parquet"),
+                engine='pyarrow', compression='zstd', index=False
+            )
+        return True
+    except Exception as e:
+        logging.error(f"保存Parquet失败 {directory}: {str(e)}")
+        return False
+
+def load_sheets_parquet(directory: str) -> Dict[str, pd.DataFrame]:
+    """
+    加载目录中的Parquet数据表
+    :param directory: 数据目录
+    :return: {数据表名称: DataFrame}，按名称排序
+    """
+    try:
+        return {
+            filename[:-len('.parquet')]: pd.read_parquet(os.path.join(directory, filename), engine='pyarrow')
+            for filename in sorted(os.listdir(directory))
+            if filename.endswith('.parquet')
+        }
+    except Exception as e:
+        logging.error(f"加载Parquet失败 {directory}: {str(e)}")
+        return {}
+
 def retry_on_failure(func, max_retries: int = 3, delay: float = 1.0):
     """重试装饰器"""
     def wrapper(*args, **kwargs):
@@ -304,22 +385,18 @@ def clean_old_files(directory: str, days: int = 7) -> int:
         if not os.path.exists(directory):
             return 0
         
-        cutoff_time = datetime.now() - timedelta(days=days)
+        cutoff_time = (datetime.now() - timedelta(days=days)).timestamp()
         cleaned_count = 0
         
-        for filename in os.listdir(directory):
-            filepath = os.path.join(directory, filename)
-            
-            if os.path.isfile(filepath):
-                file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                
-                if file_time < cutoff_time:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff_time:
                     try:
-                        os.remove(filepath)
+                        os.remove(entry.path)
                         cleaned_count += 1
-                        logging.info(f"删除旧文件: {filepath}")
+                        logging.info(f"删除旧文件: {entry.path}")
                     except Exception as e:
-                        logging.error(f"删除文件失败 {filepath}: {str(e)}")
+                        logging.error(f"删除文件失败 {entry.path}: {str(e)}")
         
         return cleaned_count
     except Exception as e:
@@ -487,6 +564,10 @@ __all__ = [
     'log_analysis_start',
     'log_analysis_end',
     'create_backup_filename',
+    'clean_sheet_name',
+    'dedupe_columns',
+    'save_sheets_parquet',
+    'load_sheets_parquet',
     'logger'
 ]
 